@@ -1,17 +1,18 @@
-
 # import necessary libraries
 import time
-s = time.time()
-from bitarray import bitarray
+from collections import namedtuple
 import numpy as np
-import struct
 
 # import all modules
-from crossover import kp_crossover
-from fitness import fitness
-from mutation import br_mutation
-from selection import tournament_selection, rank_selection
-from number_system_converter import bin_to_float, float_to_bin
+from crossover import kp_crossover_batch
+from encoding import Float64Encoding
+from evaluation import SerialEvaluator
+from fitness import fitness, fitness_batch
+from mutation import bit_flip_mutation
+from screening import screen_population
+from selection import batch_tournament_selection, round_up_to_even, survivor_selection
+from number_system_converter import float_to_bin
+from random_numbers import get_rng, uniform
 
 # ======================================================================================================================
 # ===== Helper functions ===============================================================================================
@@ -26,10 +27,13 @@ def init_population(size, n_of_chromosomes, search_domain_bounds):
     :param n_of_chromosomes: (int) number of chromosomes for each population member
     :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched
     :return: (list) containing random population
+
+    NOTE: For large populations use init_packed_population() of population.py, which stores the same population as one
+          contiguous numpy array.
     """
     population = []
     for i in range(size):
-        real_member = list(np.random.uniform(search_domain_bounds[0], search_domain_bounds[1], n_of_chromosomes))
+        real_member = list(uniform(search_domain_bounds[0], search_domain_bounds[1], n_of_chromosomes))
         binary_member = [float_to_bin(j) for j in real_member]
         population.append(binary_member)
     return population
@@ -59,25 +63,211 @@ def terminator(best_pop):
 # ===== Genetic algorithm ==============================================================================================
 # ======================================================================================================================
 
+# result of a generation, yielded by BinaryGeneticAlgorithm.generations()
+GenerationResult = namedtuple("GenerationResult",
+                              ["generation", "best_fitness", "best_member", "n_evaluations", "elapsed_time"])
+
+
+class BinaryGeneticAlgorithm:
+    """
+    This class is an implementation of binary coded genetic algorithm over a packed population (see population.py)
+
+    The engine holds the population, the fitness of every member and the random number generator, so that it can be
+    advanced one generation at a time with step(), run until a stopping criteria is met with run(), or iterated with
+    generations() to stream the result of every generation.
+
+    Algorithm (one generation):
+    --[1] Select the members for mating, by tournaments (without replacement) over the cached fitness of the population.
+    --[2] Perform k-point crossover, i.e. mate the selected members to produce children.
+    --[3] Perform bit flip mutation over the children.
+    --[4] Decode the children, screen out (repair, or mark invalid) the genes which are not finite or are outside of the
+          search domain, and evaluate fitness of the valid children. Fitness of the population is never recomputed.
+    --[5] Select the top members from the population and the children, and trim the size.
+
+    The fitness function receives the decoded member, i.e. (numpy.ndarray of float64) containing real values of genes.
+
+    :param fitness: (function) to calculate fitness of a decoded population member
+    :param fitness_batch: (function) to calculate fitness of a decoded (number of members, number of chromosomes)
+                          matrix in one call, preferred over 'fitness' if passed (see evaluation.py)
+    :param evaluator: evaluator of decoded members (see evaluation.py), e.g. ProcessPoolEvaluator to evaluate in
+                      parallel, SerialEvaluator of 'fitness' and 'fitness_batch' is used if not passed
+    :param n_of_chromosomes: (int) number of chromosomes for each population member
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched
+    :param size: (int) size of the population
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param mp: (float) mutation probability of each bit, 1 / (number of bits in a chromosome) if not passed
+    :param k: (int) number of points for crossover
+    :param tournament_size: (int) number of members allowed to participate in each tournament that is held
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param encoding: encoding of the genes (see encoding.py), raw IEEE 754 doubles are used if not passed
+    :param screening: (string) strategy to handle the offending genes, pass: "clamp", "resample" or "invalid" (see
+                      screening.py), invalid members get the worst possible fitness without being evaluated
+    :param seed: (int or numpy.random.Generator) seed of the random number generator, for reproducible runs, or the
+                 generator itself, the shared generator of random_numbers.py is used if not passed
+    """
+
+    def __init__(self, fitness, n_of_chromosomes, search_domain_bounds, size=100, cp=0.8, mp=None, k=2,
+                 tournament_size=2, mode="min", encoding=None, screening="clamp", fitness_batch=None,
+                 evaluator=None, seed=None):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(fitness, fitness_batch)
+        self.size = size
+        self.cp = cp
+        self.k = k
+        self.tournament_size = tournament_size
+        self.mode = mode
+        self.search_domain_bounds = search_domain_bounds
+        self.encoding = encoding if encoding is not None else Float64Encoding(search_domain_bounds)
+        self.screening = screening
+        self.mp = mp if mp is not None else 1 / (self.encoding.n_bits * n_of_chromosomes)
+        self.rng = get_rng(seed)
+
+        # number of parents selected for mating, i.e. number of children produced in every generation
+        self.n_offspring = round_up_to_even(size * cp)
+
+        # Step 1: Initialize the population, and evaluate it once
+        self.start_time = time.time()
+        self.generation = 0
+        self.n_evaluations = 0
+        self.population = self.encoding.random_population(size, n_of_chromosomes, self.rng)
+        self.fitnesses = self.evaluate(self.population)
+
+    def evaluate(self, packed):
+        """
+        Method to decode packed members, screen them, and evaluate fitness of the valid ones
+
+        :param packed: (numpy.ndarray) containing packed members, repaired in place if screening repairs any gene
+        :return: (numpy.ndarray of float64) containing fitness of each member, worst possible fitness for invalid ones
+        """
+        decoded = self.encoding.decode(packed)
+        valid, repaired = screen_population(decoded, self.search_domain_bounds, self.screening, self.rng)
+        # keep the packed members in sync with the repaired values, if decoding made a copy
+        if repaired and not np.shares_memory(decoded, packed):
+            packed[...] = self.encoding.encode(decoded)
+
+        fitnesses = np.full(len(decoded), np.inf if self.mode == "min" else -np.inf)
+        if valid.any():
+            fitnesses[valid] = self.evaluator(decoded[valid])
+        self.n_evaluations += int(np.count_nonzero(valid))
+        return fitnesses
+
+    def best_index(self):
+        """
+        Method to find the index of the fittest member of the population
+
+        :return: (int) index of the fittest member
+        """
+        if self.mode == "min":
+            return int(np.argmin(self.fitnesses))
+        return int(np.argmax(self.fitnesses))
+
+    def select(self):
+        """
+        Method to select the members for mating, by tournaments over the cached fitness of the population
+
+        :return: (numpy.ndarray of int) containing indices of selected members
+        """
+        return batch_tournament_selection(self.fitnesses, self.cp, self.tournament_size, self.mode, self.rng)
+
+    def survive(self, offspring, offspring_fitnesses):
+        """
+        Method to select the top members from the population and the children, and trim the size
+
+        The children entering the population overwrite the members they replace, in place (see survivor_selection()).
+
+        :param offspring: (numpy.ndarray) containing packed children
+        :param offspring_fitnesses: (numpy.ndarray of float64) containing fitness of each child
+        """
+        replaced, entering = survivor_selection(self.fitnesses, offspring_fitnesses, self.mode)
+        self.population[replaced] = offspring[entering]
+        self.fitnesses[replaced] = offspring_fitnesses[entering]
+
+    def step(self):
+        """
+        Method to advance the algorithm by one generation
+
+        :return: (GenerationResult) containing result of the generation
+        """
+        # Step 2: Select the members for mating
+        selected = self.select()
+
+        # Step 3: Perform crossover, i.e. mate the selected members to produce children
+        c1, c2 = kp_crossover_batch(self.population[selected[0::2]], self.population[selected[1::2]], self.k,
+                                    self.rng, self.encoding.n_bits)
+        offspring = np.concatenate((c1, c2))
+
+        # Step 4: Perform mutation over the children
+        bit_flip_mutation(offspring, self.mp, self.rng, self.encoding.n_bits)
+
+        # Step 5: Evaluate fitness of the children, and select the top members and trim the size
+        self.survive(offspring, self.evaluate(offspring))
+
+        self.generation += 1
+        return self.result()
+
+    def result(self):
+        """
+        Method to summarize the current state of the algorithm
+
+        :return: (GenerationResult) containing generation number, best fitness, decoded best member, number of fitness
+                 evaluations so far and elapsed time
+        """
+        best = self.best_index()
+        best_member = np.array(self.encoding.decode(self.population[best:best + 1])[0])
+        return GenerationResult(self.generation, self.fitnesses[best], best_member, self.n_evaluations,
+                                time.time() - self.start_time)
+
+    def generations(self):
+        """
+        Generator advancing the algorithm one generation at a time, for streaming consumers
+
+        :return: (generator) yielding GenerationResult of every generation, endlessly
+        """
+        while True:
+            yield self.step()
 
-# Define parameters
-cp = 0.8
-mp = 0.2
+    def run(self, max_generations=None, max_evaluations=None, time_budget=None):
+        """
+        Method to run the algorithm until a stopping criteria is met
 
-# Step 1: Initialize the population
+        At least one stopping criteria should be passed. The algorithm stops before a generation which would exceed
+        'max_evaluations', and after the generation which exceeds 'time_budget'.
 
-# Repeat from step 2 to 5 until termination criteria is not met
+        :param max_generations: (int) maximum number of generations
+        :param max_evaluations: (int) maximum number of fitness evaluations, including the initial population
+        :param time_budget: (float) maximum running time in seconds, measured from the creation of the engine
+        :return: (GenerationResult) containing result of the last generation
+        """
+        if max_generations is None and max_evaluations is None and time_budget is None:
+            raise ValueError("Please pass at least one stopping criteria")
 
-# Step 2: Select the members for mating
+        result = self.result()
+        # Check for terminating condition
+        while True:
+            if max_generations is not None and self.generation >= max_generations:
+                break
+            if max_evaluations is not None and self.n_evaluations + self.n_offspring > max_evaluations:
+                break
+            if time_budget is not None and time.time() - self.start_time >= time_budget:
+                break
+            result = self.step()
+        return result
 
-# Step 3: Perform crossover, i.e. mate the selected members to produce children
 
-# Step 4: Perform mutation over the population: first select population, and then perform mutation
+if __name__ == "__main__":
+    s = time.time()
 
-# Step 5: Evaluate fitness the new population, and select the top members and trim the size
+    # Define parameters
+    cp = 0.8
+    mp = None  # mutation probability of each bit, defaults to 1 / (number of bits in a chromosome)
 
-# Check for terminating condition
+    ga = BinaryGeneticAlgorithm(fitness, n_of_chromosomes=10, search_domain_bounds=[-5, 5], size=100, cp=cp, mp=mp,
+                                fitness_batch=fitness_batch)
+    best = ga.run(max_generations=500)
+    print("Best fitness: ", best.best_fitness)
+    print("Best member: ", best.best_member)
 
-# Print elapsed time
-e = time.time() - s
-print("Elapsed Time: ", e)
+    # Print elapsed time
+    e = time.time() - s
+    print("Elapsed Time: ", e)
@@ -8,6 +8,9 @@
 import numpy as np
 from bitarray import bitarray
 
+from population import GENE_BITS, is_packed
+from random_numbers import distinct_indices, get_rng, random_bits
+
 # =====================================================================================================================
 # ===== Helper functions ==============================================================================================
 # =====================================================================================================================
@@ -17,19 +20,55 @@ def unique_rn_generator(low, high, n):
     """
     Function to generate a list of unique random integers
 
-    This function uses numpy's random number generator to generate a list of random numbers, checks if all the numbers
-    in the list are unique, if they are unique, the list is returned. If they are not unique, then the list is generated
-    repeatedly until a list with unique numbers is generated.
+    The numbers are drawn without repetition in the first place (see distinct_indices() of random_numbers.py), instead
+    of regenerating the list until it has no repetitions, which may take very long when 'n' is close to high - low.
 
     :param low: (int) lowest (inclusive) acceptable random number
     :param high: (int) highest (not inclusive) acceptable random number
     :param n: (int) number of random numbers to be generated
     :return: (list) containing 'n' unique random numbers
     """
-    r = np.random.randint(low, high, n)
-    while len(r) != len(set(r)):
-        r = np.random.randint(low, high, n)
-    return r
+    return distinct_indices(low, high, n)
+
+
+def suffix_mask(i, n_bits=GENE_BITS):
+    """
+    Function to generate a mask of a packed gene, covering all the bits from the i'th bit (counted from the left, as in
+    a bitarray) till the end of the gene
+
+    :param i: (int or numpy.ndarray of int) index of the first bit covered by the mask, should be between 0 and
+              n_bits - 1
+    :param n_bits: (int) number of bits per gene (see encoding.py)
+    :return: (numpy.uint64 or numpy.ndarray of uint64) containing the mask(s)
+    """
+    shift = (n_bits - np.asarray(i)).astype(np.uint64)
+    return (np.uint64(1) << shift) - np.uint64(1)
+
+
+def as_packed(parents, n_bits=None):
+    """
+    Function to convert an array of parents to a packed array, and find the number of bits per gene
+
+    :param parents: (numpy.ndarray of unsigned int) containing packed parents, any other type is converted to uint64
+    :param n_bits: (int) number of bits per gene (see encoding.py), all the bits of the type are used if not passed
+    :return: (tuple) containing packed parents and number of bits per gene
+    """
+    parents = np.asarray(parents)
+    if parents.dtype.kind != "u":
+        parents = parents.astype(np.uint64)
+    if n_bits is None:
+        n_bits = parents.dtype.itemsize * 8
+    return parents, n_bits
+
+
+def bits_to_mask(bits):
+    """
+    Function to convert an array of GENE_BITS zeros and ones into a mask of a packed gene
+
+    :param bits: (numpy.ndarray) containing zeros and ones, leftmost value corresponds to the most significant bit
+    :return: (numpy.uint64) containing the mask
+    """
+    return np.frombuffer(np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes(), dtype=">u8").astype(np.uint64)[0]
 
 # =====================================================================================================================
 # ===== Crossover Operators ===========================================================================================
@@ -53,12 +92,20 @@ def kp_crossover(parent1, parent2, k):
                 performing two single-point crossovers with different crossover points.
           This strategy can be generalized to k-point crossover for any positive integer k, picking k crossover points.
 
-    :param parent1: (list of bitarray) containing chromosomes of parent 1
-    :param parent2: (list of bitarray) containing chromosomes of parent 2
+    Packed parents (see population.py) are crossed with bit masks: for every gene, the mask has 1's at the positions
+    where the switch is on, and the masked bits are swapped between the parents with XOR.
+
+    :param parent1: (list of bitarray or numpy.ndarray of uint64) containing chromosomes of parent 1
+    :param parent2: (list of bitarray or numpy.ndarray of uint64) containing chromosomes of parent 2
     :param k: (int) number of points for crossover
-    :return: (list of list of bitarray) containing 2 children of parent 1 and parent 2
+    :return: (list of list of bitarray or list of numpy.ndarray) containing 2 children of parent 1 and parent 2
     """
 
+    # if parents are packed, cross them over as a mating pool of a single pair
+    if is_packed(parent1):
+        c1, c2 = kp_crossover_batch(np.asarray(parent1)[None], np.asarray(parent2)[None], k)
+        return [c1[0], c2[0]]
+
     c1 = []
     c2 = []
     for j in range(len(parent1)):
@@ -92,13 +139,21 @@ def uniform_crossover(parent1, parent2):
     --[2] Swap the gene values of parents for positions where there are 1's in mask, and do nothing where there are 0's
           in the mask.
 
-    :param parent1: (list of bitarray) containing genes of parent 1
-    :param parent2: (list of bitarray) containing genes of parent 2
-    :return: (list of list of bitarrays) containing 2 children of parent 1 and parent 2
+    :param parent1: (list of bitarray or numpy.ndarray of uint64) containing genes of parent 1
+    :param parent2: (list of bitarray or numpy.ndarray of uint64) containing genes of parent 2
+    :return: (list of list of bitarrays or list of numpy.ndarray) containing 2 children of parent 1 and parent 2
     """
+    # if parents are packed, convert the mask to a packed gene, and swap the masked bits of every gene in one go
+    if is_packed(parent1):
+        parent1 = np.asarray(parent1, dtype=np.uint64)
+        parent2 = np.asarray(parent2, dtype=np.uint64)
+        mask = bits_to_mask(get_rng().integers(0, 2, GENE_BITS))
+        diff = (parent1 ^ parent2) & mask
+        return [parent1 ^ diff, parent2 ^ diff]
+
     c1 = []
     c2 = []
-    mask = np.random.randint(0, 2, len(parent1[0]))
+    mask = get_rng().integers(0, 2, len(parent1[0]))
     for j in range(len(parent1)):
         c1m = bitarray()
         c2m = bitarray()
@@ -111,4 +166,85 @@ def uniform_crossover(parent1, parent2):
                 c2m.append(parent2[j][i])
         c1.append(c1m)
         c2.append(c2m)
-    return [c1, c2]
\ No newline at end of file
+    return [c1, c2]
+
+# =====================================================================================================================
+# ===== Batch Crossover Operators =====================================================================================
+# =====================================================================================================================
+
+# The following operators cross over all the selected pairs of a packed population (see population.py and encoding.py)
+# at once. The mating pool is passed as two arrays of the same shape, where i'th row of 'parents1' is mated with i'th row
+# of 'parents2', e.g. for indices 'selected' returned by a selection algorithm:
+#       kp_crossover_batch(population[selected[0::2]], population[selected[1::2]], k)
+
+
+def kp_crossover_batch(parents1, parents2, k, rng=None, n_bits=None):
+    """
+    This function is a vectorized implementation of "k-point crossover" over the whole mating pool
+
+    Algorithm:
+    --[1] For every gene of every pair of parents, generate k unique crossover points between 1 and n_bits - 1.
+    --[2] Turn every set of points into a prefix-parity mask: XOR of the suffix masks starting at each point. A bit of
+          the mask is 1 if an odd number of crossover points lie at or before it, i.e. where the switch of
+          kp_crossover() is on.
+    --[3] Swap the masked bits between the parents with XOR: d = (p1 ^ p2) & mask, c1 = p1 ^ d, c2 = p2 ^ d
+
+    :param parents1: (numpy.ndarray of unsigned int) of shape (number of pairs, number of genes) containing first
+                     parents
+    :param parents2: (numpy.ndarray of unsigned int) of shape (number of pairs, number of genes) containing second
+                     parents
+    :param k: (int) number of points for crossover
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :param n_bits: (int) number of bits per gene (see encoding.py), all the bits of the type are used if not passed
+    :return: (list of numpy.ndarray) containing 2 arrays of children, of the same shape and type as parents
+    """
+    parents1, n_bits = as_packed(parents1, n_bits)
+    parents2 = np.asarray(parents2, dtype=parents1.dtype)
+    if parents1.shape != parents2.shape:
+        raise ValueError("Both arrays of parents should have the same shape")
+
+    # build prefix-parity masks, one crossover point at a time
+    points = distinct_indices(1, n_bits, k, parents1.shape, rng=rng)
+    mask = np.zeros(parents1.shape, dtype=np.uint64)
+    for j in range(k):
+        mask ^= suffix_mask(points[..., j], n_bits)
+    mask = mask.astype(parents1.dtype)
+
+    # XOR-swap the masked bits
+    diff = (parents1 ^ parents2) & mask
+    return [parents1 ^ diff, parents2 ^ diff]
+
+
+def uniform_crossover_batch(parents1, parents2, rng=None):
+    """
+    This function is a vectorized implementation of "uniform crossover" over the whole mating pool
+
+    Algorithm:
+    --[1] Generate a random mask for every pair of parents, each bit of the mask is 0 or 1 with equal probability. As in
+          uniform_crossover(), the same mask is used for all the genes of a pair.
+    --[2] Swap the masked bits between the parents with XOR: d = (p1 ^ p2) & mask, c1 = p1 ^ d, c2 = p2 ^ d
+
+    NOTE: Bits above 'n_bits' are zero in both the parents, so they are never swapped, and a mask covering all the bits
+          of the type can be used for any number of bits per gene.
+
+    :param parents1: (numpy.ndarray of unsigned int) of shape (number of pairs, number of genes) containing first
+                     parents
+    :param parents2: (numpy.ndarray of unsigned int) of shape (number of pairs, number of genes) containing second
+                     parents
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (list of numpy.ndarray) containing 2 arrays of children, of the same shape and type as parents
+    """
+    rng = get_rng(rng)
+    parents1, _ = as_packed(parents1)
+    parents2 = np.asarray(parents2, dtype=parents1.dtype)
+    if parents1.shape != parents2.shape:
+        raise ValueError("Both arrays of parents should have the same shape")
+
+    # one mask of random bits per pair
+    mask = random_bits((len(parents1), 1), parents1.dtype, rng)
+
+    # XOR-swap the masked bits
+    diff = (parents1 ^ parents2) & mask
+    return [parents1 ^ diff, parents2 ^ diff]
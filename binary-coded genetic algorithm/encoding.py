@@ -0,0 +1,179 @@
+# Chromosome encodings: how a real valued gene is represented by the bits of a packed population
+
+# [1] Float64 encoding: gene is the raw IEEE 754 binary64 representation of the real value (see
+#   number_system_converter.py). It needs 64 bits per gene, and a single bit flip in the exponent field can move the
+#   value across many orders of magnitude, or make it infinite or NaN.
+# [2] Fixed-point encoding: search domain [lower bound, upper bound] is divided into 2^n - 1 equal steps, and a gene is
+#   the n-bit unsigned integer number of steps above the lower bound. Every bit pattern is a valid value inside the
+#   search domain, and a bit flip moves the value by at most half of the search domain.
+# [3] Gray encoding: same as fixed-point, but the integer is stored in reflected binary (Gray) code, so that
+#   neighbouring values differ in a single bit. This removes the "Hamming cliffs" of plain binary, e.g. 0111 -> 1000.
+
+# Packed populations of fixed-point and Gray encodings use the smallest unsigned integer type able to hold n bits, e.g.
+# 16-bit genes are stored as uint16, so memory and cost of crossover/mutation shrink in proportion to the bit width.
+
+# All the encodings share the same interface:
+#   encoding.n_bits :: number of bits per gene
+#   encoding.dtype :: numpy type of a packed gene
+#   encoding.encode(values) :: (numpy.ndarray of float64) real values -> (numpy.ndarray of dtype) packed population
+#   encoding.decode(packed) :: (numpy.ndarray of dtype) packed population -> (numpy.ndarray of float64) real values
+#   encoding.random_population(size, n_of_chromosomes) :: random packed population
+
+# import necessary libraries
+
+import numpy as np
+
+from number_system_converter import decode_population, encode_population
+from random_numbers import get_rng, random_bits
+
+# ======================================================================================================================
+# ===== Helper functions ===============================================================================================
+# ======================================================================================================================
+
+
+def gene_dtype(n_bits):
+    """
+    Function to find the smallest unsigned integer type which can store a gene of 'n_bits' bits
+
+    :param n_bits: (int) number of bits per gene, should be between 1 and 64
+    :return: (numpy.dtype) smallest unsigned integer type holding 'n_bits' bits
+    """
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_bits <= np.iinfo(dtype).bits:
+            return np.dtype(dtype)
+    raise ValueError("Genes wider than 64 bits are not supported, got {} bits".format(n_bits))
+
+
+def gray_encode(n):
+    """
+    Function to convert unsigned integers to reflected binary (Gray) code: g = n ^ (n >> 1)
+
+    :param n: (numpy.ndarray of unsigned int) containing integers to be converted
+    :return: (numpy.ndarray of unsigned int) containing Gray codes of the integers
+    """
+    n = np.asarray(n)
+    return n ^ (n >> n.dtype.type(1))
+
+
+def gray_decode(g, n_bits):
+    """
+    Function to convert reflected binary (Gray) codes back to unsigned integers
+
+    Integer is the prefix XOR of the bits of the Gray code, computed in log2(n_bits) steps:
+    n = g ^ (g >> 1) ^ (g >> 2) ^ ... = g ^= g >> 1, g ^= g >> 2, g ^= g >> 4, ...
+
+    :param g: (numpy.ndarray of unsigned int) containing Gray codes to be converted
+    :param n_bits: (int) number of bits per code
+    :return: (numpy.ndarray of unsigned int) containing integers
+    """
+    n = np.array(g, copy=True)
+    shift = 1
+    while shift < n_bits:
+        n ^= n >> n.dtype.type(shift)
+        shift *= 2
+    return n
+
+# ======================================================================================================================
+# ===== Encodings ======================================================================================================
+# ======================================================================================================================
+
+
+class Float64Encoding:
+    """
+    Gene is the raw IEEE 754 binary64 representation of the real value
+
+    Decoded array shares memory with the packed population (see number_system_converter.py).
+
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, only used to
+                                 generate random population
+    """
+
+    n_bits = 64
+    dtype = np.dtype(np.uint64)
+
+    def __init__(self, search_domain_bounds=(0.0, 1.0)):
+        self.lower = np.asarray(search_domain_bounds[0], dtype=np.float64)
+        self.upper = np.asarray(search_domain_bounds[1], dtype=np.float64)
+
+    def encode(self, values):
+        return encode_population(values)
+
+    def decode(self, packed):
+        return decode_population(packed)
+
+    def random_population(self, size, n_of_chromosomes, rng=None):
+        rng = get_rng(rng)
+        return self.encode(rng.uniform(self.lower, self.upper, (size, n_of_chromosomes)))
+
+
+class FixedPointEncoding:
+    """
+    Gene is an n-bit unsigned integer, the number of (upper bound - lower bound) / (2^n - 1) steps above the lower bound
+
+    Values outside of the search domain are clipped to its bounds while encoding, and values are rounded to the
+    nearest step, i.e. the resolution of the encoding is (upper bound - lower bound) / (2^n - 1).
+
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene
+    :param n_bits: (int) number of bits per gene, should be between 1 and 52 (resolution of a double)
+    """
+
+    def __init__(self, search_domain_bounds, n_bits=16):
+        if not 1 <= n_bits <= 52:
+            raise ValueError("Number of bits of fixed-point gene should be between 1 and 52, got {}".format(n_bits))
+        self.n_bits = n_bits
+        self.dtype = gene_dtype(n_bits)
+        self.lower = np.asarray(search_domain_bounds[0], dtype=np.float64)
+        self.upper = np.asarray(search_domain_bounds[1], dtype=np.float64)
+        if np.any(self.upper <= self.lower):
+            raise ValueError("Upper bound of search domain should be greater than the lower bound")
+        self.levels = float(2 ** n_bits - 1)
+        self.step = (self.upper - self.lower) / self.levels
+
+    def encode(self, values):
+        # number of steps above lower bound, rounded to the nearest step and clipped to the search domain
+        q = np.rint((np.asarray(values, dtype=np.float64) - self.lower) / self.step)
+        return np.clip(q, 0, self.levels).astype(self.dtype)
+
+    def decode(self, packed):
+        return self.lower + np.asarray(packed).astype(np.float64) * self.step
+
+    def random_population(self, size, n_of_chromosomes, rng=None):
+        # random bits are a uniform random integer, keep the lowest n_bits of it
+        packed = random_bits((size, n_of_chromosomes), self.dtype, rng)
+        return packed & self.dtype.type(2 ** self.n_bits - 1)
+
+
+class GrayEncoding(FixedPointEncoding):
+    """
+    Gene is the reflected binary (Gray) code of the n-bit fixed-point gene (see FixedPointEncoding)
+
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene
+    :param n_bits: (int) number of bits per gene, should be between 1 and 52 (resolution of a double)
+    """
+
+    def encode(self, values):
+        return gray_encode(FixedPointEncoding.encode(self, values))
+
+    def decode(self, packed):
+        return FixedPointEncoding.decode(self, gray_decode(packed, self.n_bits))
+
+
+def make_encoding(name, search_domain_bounds, n_bits=16):
+    """
+    Function to create an encoding by its name
+
+    :param name: (string) name of the encoding, pass: "float64", "fixed" or "gray"
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched
+    :param n_bits: (int) number of bits per gene, ignored by "float64" encoding
+    :return: encoding object
+    """
+    if name == "float64":
+        return Float64Encoding(search_domain_bounds)
+    elif name == "fixed":
+        return FixedPointEncoding(search_domain_bounds, n_bits)
+    elif name == "gray":
+        return GrayEncoding(search_domain_bounds, n_bits)
+    else:
+        raise ValueError("Incorrect encoding selected, please pass 'float64', 'fixed' or 'gray' as name")
@@ -0,0 +1,139 @@
+# Memoization of fitness evaluations
+
+# The same chromosome is often evaluated more than once: elites survive unchanged from generation to generation, and
+# crossover may reproduce one of the parents. If the fitness function is expensive (e.g. a simulation), every avoided
+# evaluation saves real time. FitnessCache wraps the fitness function, and remembers the fitness of recently evaluated
+# chromosomes, keyed on a digest of their canonical byte representation.
+
+# The cache is opt-in: wrap the fitness function and use the wrapper in its place, e.g.
+#       cached_fitness = FitnessCache(fitness, max_entries=100000)
+#       cached_fitness(chromosome)
+#       print(cached_fitness.hits, cached_fitness.misses)
+
+# NOTE: Only deterministic fitness functions should be cached, a noisy fitness function will always return the value of
+#       its first evaluation.
+
+# import necessary libraries
+import hashlib
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+# ======================================================================================================================
+# ===== Helper functions ===============================================================================================
+# ======================================================================================================================
+
+
+def chromosome_bytes(chromosome):
+    """
+    Function to serialize a chromosome into its canonical byte representation
+
+    Canonical representations:
+        numpy array :: raw buffer, type and shape of the array, e.g. packed population member
+        list of bitarray :: bytes of every bitarray, each prefixed with its length in bits
+        list of float :: raw buffer of float64 array of the values, i.e. same as the numpy array of float64
+
+    :param chromosome: (numpy.ndarray, list of bitarray, or list of float) chromosome to be serialized
+    :return: (bytes) canonical byte representation of the chromosome
+    """
+    if not isinstance(chromosome, np.ndarray):
+        # list of bitarray
+        if len(chromosome) and hasattr(chromosome[0], "tobytes") and not isinstance(chromosome[0], np.generic):
+            return b"".join(len(gene).to_bytes(8, "little") + gene.tobytes() for gene in chromosome)
+        chromosome = np.asarray(chromosome, dtype=np.float64)
+    chromosome = np.ascontiguousarray(chromosome)
+    header = "{}{}".format(chromosome.dtype.str, chromosome.shape).encode()
+    return header + chromosome.tobytes()
+
+
+def chromosome_digest(chromosome):
+    """
+    Function to compute a 128-bit digest of the canonical byte representation of a chromosome
+
+    :param chromosome: (numpy.ndarray, list of bitarray, or list of float) chromosome to be hashed
+    :return: (bytes) 16 bytes long digest
+    """
+    return hashlib.blake2b(chromosome_bytes(chromosome), digest_size=16).digest()
+
+# ======================================================================================================================
+# ===== Fitness cache ==================================================================================================
+# ======================================================================================================================
+
+
+class FitnessCache:
+    """
+    Wrapper of a fitness function, remembering the fitness of recently evaluated chromosomes
+
+    The cache is bounded by the number of entries, or by their (approximate) size in bytes, or both. When a bound is
+    exceeded, the least recently used entries are evicted.
+
+    :param fitness: (function) fitness function to be wrapped
+    :param max_entries: (int) maximum number of cached fitnesses, unbounded if not passed
+    :param max_bytes: (int) maximum size of cached entries in bytes, unbounded if not passed
+    """
+
+    def __init__(self, fitness, max_entries=None, max_bytes=None):
+        self.fitness = fitness
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, chromosome):
+        key = chromosome_digest(chromosome)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        value = self.fitness(chromosome)
+        self.entries[key] = value
+        self.n_bytes += self.entry_size(key, value)
+        self.evict()
+        return value
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def entry_size(key, value):
+        """
+        Method to estimate the memory used by a cache entry
+
+        :param key: (bytes) digest of the chromosome
+        :param value: fitness of the chromosome
+        :return: (int) approximate size of the entry in bytes
+        """
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def evict(self):
+        """
+        Method to evict the least recently used entries, until the cache is within its bounds
+        """
+        while self.entries and ((self.max_entries is not None and len(self.entries) > self.max_entries) or
+                                (self.max_bytes is not None and self.n_bytes > self.max_bytes)):
+            key, value = self.entries.popitem(last=False)
+            self.n_bytes -= self.entry_size(key, value)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Method to empty the cache, counters of hits and misses are kept
+        """
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def stats(self):
+        """
+        Method to summarize the usage of the cache
+
+        :return: (dict) containing number of hits, misses and evictions, hit rate, number of entries and their size
+        """
+        calls = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / calls if calls else 0.0, "entries": len(self.entries), "bytes": self.n_bytes}
@@ -6,6 +6,9 @@
 from bitarray import bitarray
 import numpy as np
 
+from population import is_packed
+from random_numbers import get_rng
+
 # Bit reversal mutation
 # Generate a random number between 0 and 1, multiply it with number of genes in the chromosome, take integer part of it
 # and select that index in the chromosome, and flip the bit value at that index.
@@ -21,11 +24,102 @@ def br_mutation(chromosome):
           part of it.
     --[3] Select 'rth' gene from chromosome, and flip/invert its value
 
-    :param chromosome: (list of bitarray) of bits containing some number of genes, representing a chromosome
-    :return: (bitarray) containing mutated chromosome
+    A packed chromosome (see population.py and encoding.py) is mutated in place by XOR-ing all of its genes with a
+    mask, which has 1's at the flipped positions, every bit of the type of the packed genes can be flipped.
+
+    :param chromosome: (list of bitarray or numpy.ndarray of unsigned int) of bits containing some number of genes,
+                       representing a chromosome
+    :return: (bitarray or numpy.ndarray of unsigned int) containing mutated chromosome
     """
-    r = np.random.randint(0,len(chromosome[0]),40)
+    # if chromosome is packed, flip the bits of every gene with a single XOR. Flipping the same bit twice restores it,
+    # so the mask is built with XOR as well.
+    if is_packed(chromosome):
+        if chromosome.dtype.kind != "u":
+            raise TypeError("Packed chromosome should be an array of unsigned integers")
+        n_bits = chromosome.dtype.itemsize * 8
+        r = get_rng().integers(0, n_bits, 40)
+        mask = 0
+        for k in r:
+            mask ^= 1 << (n_bits - 1 - int(k))
+        chromosome ^= chromosome.dtype.type(mask)
+        return chromosome
+
+    r = get_rng().integers(0, len(chromosome[0]), 40)
     for i in chromosome:
         for k in r:
             i[k] = not(i[k])
-    return chromosome
\ No newline at end of file
+    return chromosome
+
+# Bit flip mutation of the whole population
+# Every bit of every gene of every population member is flipped independently with probability 'mp'. Instead of drawing
+# a random number for every bit, the gaps between consecutive flipped bits are drawn: for independent flips with
+# probability 'mp', the gap is geometrically distributed, so only as many random numbers as there are flips are needed.
+
+
+def geometric_positions(n, mp, rng=None):
+    """
+    Function to sample the positions of successes in 'n' independent trials with success probability 'mp'
+
+    Algorithm:
+    --[1] Draw gaps between consecutive successes from geometric distribution with probability 'mp', enough of them to
+          cover 'n' trials with high probability.
+    --[2] Cumulative sum of the gaps gives the positions of successes, keep drawing more gaps until the positions
+          exceed 'n', then drop the positions beyond 'n'.
+
+    :param n: (int) number of trials
+    :param mp: (float) success probability of each trial, should be between 0 and 1
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (numpy.ndarray of int) containing sorted unique positions of successes, between 0 and n - 1
+    """
+    rng = get_rng(rng)
+    if mp <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if mp >= 1:
+        return np.arange(n, dtype=np.int64)
+
+    chunks = []
+    last = -1
+    while last < n:
+        # expected number of remaining successes, plus a margin of 4 standard deviations
+        expected = (n - last - 1) * mp
+        size = int(expected + 4 * np.sqrt(expected) + 16)
+        positions = last + np.cumsum(rng.geometric(mp, size), dtype=np.int64)
+        chunks.append(positions)
+        last = positions[-1]
+    positions = np.concatenate(chunks)
+    return positions[positions < n]
+
+
+def bit_flip_mutation(population, mp, rng=None, n_bits=None):
+    """
+    Function to perform bit flip mutation over a packed population
+
+    Algorithm:
+    --[1] Sample the positions of flipped bits in the whole population, every bit is flipped with probability 'mp'
+          (see geometric_positions())
+    --[2] Split each position into the index of the gene and the bit inside the gene, and XOR the genes with the
+          flipped bits in one go, in place.
+
+    The cost is proportional to the number of flipped bits, not to the number of bits in the population.
+
+    :param population: (numpy.ndarray of unsigned int) C contiguous array containing packed population (see
+                       population.py and encoding.py), mutated in place
+    :param mp: (float) mutation probability of each bit, typically around 1 / (number of bits in a chromosome)
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :param n_bits: (int) number of bits per gene (see encoding.py), all the bits of the type are used if not passed
+    :return: (numpy.ndarray of unsigned int) containing mutated population, i.e. the input array
+    """
+    if not isinstance(population, np.ndarray) or population.dtype.kind != "u":
+        raise TypeError("Population should be a packed array of unsigned integers")
+    if not population.flags.c_contiguous:
+        raise ValueError("Population should be C contiguous to be mutated in place")
+    if n_bits is None:
+        n_bits = population.dtype.itemsize * 8
+
+    positions = geometric_positions(population.size * n_bits, mp, rng)
+    genes, bits = np.divmod(positions, n_bits)
+    flips = np.left_shift(1, bits.astype(np.uint64), dtype=np.uint64).astype(population.dtype)
+    np.bitwise_xor.at(population.reshape(-1), genes, flips)
+    return population
@@ -1,48 +1,67 @@
 # Functions to take care of binary to float and back to binary conversions
 
-# The following functions are not my implementations, they have been taken from:
+# bin_to_float() and float_to_bin() are based on:
 #   https://stackoverflow.com/questions/8751653/how-to-convert-a-binary-string-into-a-float-value
 
+# A gene is the raw IEEE 754 binary64 representation of a real value. The population level functions below do not
+# convert anything at all: a packed population (see population.py) and an array of doubles share the same memory, and
+# are just two different views of it. The scalar functions are thin wrappers over the population level ones.
+
 # import necessary libraries
 
-import struct
 from bitarray import bitarray
+from bitarray.util import ba2int
 import numpy as np
 
 # ======================================================================================================================
-# ===== Helper functions ===============================================================================================
+# ===== Main functions =================================================================================================
 # ======================================================================================================================
 
 
-def int_to_bytes(n, minlen=0):  # Helper function
-    """ Int/long to byte string.
-        Python 3.2+ has a built-in int.to_bytes() method that could be
-        used instead, but the following is portable.
+def decode_population(packed):
     """
-    nbits = n.bit_length() + (1 if n < 0 else 0)  # +1 for any sign bit.
-    nbytes = (nbits+7) // 8  # Number of whole bytes.
-    b = bytearray()
-    for _ in range(nbytes):
-        b.append(n & 0xff)
-        n >>= 8
-    if minlen and len(b) < minlen:  # Zero padding needed?
-        b.extend([0] * (minlen-len(b)))
-    return bytearray(reversed(b))  # High bytes first.
+    Function to decode a packed population into real values
 
-# ======================================================================================================================
-# ===== Main functions =================================================================================================
-# ======================================================================================================================
+    The packed genes are reinterpreted as doubles, without copying, so the returned array shares memory with the packed
+    population: writing into one of them changes the other.
+
+    :param packed: (numpy.ndarray of uint64) of any shape, e.g. (population size, number of genes), containing packed
+                   population
+    :return: (numpy.ndarray of float64) of the same shape containing real values of the genes
+    """
+    packed = np.asarray(packed)
+    if packed.dtype != np.uint64:
+        raise TypeError("Packed population should be an array of uint64, got {}".format(packed.dtype))
+    return packed.view(np.float64)
+
+
+def encode_population(values):
+    """
+    Function to encode real values into a packed population
+
+    The doubles are reinterpreted as packed genes, without copying if 'values' already is an array of float64 (with
+    C contiguous last axis), so the returned array shares memory with it.
+
+    :param values: (numpy.ndarray of float64, or list) of any shape, e.g. (population size, number of genes)
+                   containing real values of the genes
+    :return: (numpy.ndarray of uint64) of the same shape containing packed population
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim and values.strides[-1] != values.itemsize:
+        values = np.ascontiguousarray(values)
+    return values.view(np.uint64)
 
 
 def bin_to_float(b):
     """ Convert bitarray (binary string) to a float. """
-    b = b.to01()
-    bf = int_to_bytes(int(b, 2), 8)  # 8 bytes needed for IEEE 754 binary64.
-    return struct.unpack('>d', bf)[0]
+    # ba2int() reads the first bit of a little endian bitarray as the least significant one, so the bitarray is made big
+    # endian first, which keeps the order of its bits
+    packed = np.array([ba2int(bitarray(b, endian="big"))], dtype=np.uint64)  # 64 bits needed for IEEE 754 binary64.
+    return float(decode_population(packed)[0])
 
 
 def float_to_bin(value):  # For testing.
     """ Convert float to 64-bit bitarray (binary string). """
-    [d] = struct.unpack(">Q", struct.pack(">d", value))
-    # return '{:064b}'.format(d)
-    return bitarray('{:064b}'.format(d))
+    b = bitarray(endian="big")
+    b.frombytes(encode_population([value]).astype(">u8").tobytes())
+    return b
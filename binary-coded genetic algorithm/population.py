@@ -0,0 +1,126 @@
+# Packed, array-backed storage for the population of binary coded genetic algorithm
+
+# The classic representation of a population member is a list of 64-bit bitarrays, one bitarray per gene. This is easy
+# to read, but every gene is a separate python object, and every operator has to walk through it bit by bit.
+# A packed population stores the whole population as one contiguous numpy array of shape (population size, number of
+# genes), where each gene is stored as a single unsigned 64-bit integer. Bit 'i' of a bitarray gene (counted from the
+# left, as in the bitarray) is the bit '63 - i' of the corresponding integer, i.e. the leftmost bit is the most
+# significant one.
+
+# NOTE: Operators of this package accept both the representations, use the functions below to convert between them.
+
+# import necessary libraries
+
+import numpy as np
+from bitarray import bitarray
+from bitarray.util import ba2int
+
+from number_system_converter import encode_population
+from random_numbers import uniform
+
+# ======================================================================================================================
+# ===== Helper functions ===============================================================================================
+# ======================================================================================================================
+
+# number of bits used to store one gene in a packed population
+GENE_BITS = 64
+
+
+def is_packed(population):
+    """
+    Function to check if a population (or a single population member) is stored in packed form
+
+    :param population: population, or a population member, either packed or in list of bitarray form
+    :return: True, if the input is a packed numpy array, else False
+    """
+    return isinstance(population, np.ndarray)
+
+# ======================================================================================================================
+# ===== Conversion functions ===========================================================================================
+# ======================================================================================================================
+
+
+def pack_member(chromosome):
+    """
+    Function to convert a population member from list of bitarray form to packed form
+
+    :param chromosome: (list of bitarray) containing 64-bit genes of a population member
+    :return: (numpy.ndarray of uint64) of shape (number of genes,) containing packed genes
+    """
+    return pack_population([chromosome])[0]
+
+
+def unpack_member(chromosome):
+    """
+    Function to convert a packed population member back to list of bitarray form
+
+    :param chromosome: (numpy.ndarray of uint64) of shape (number of genes,) containing packed genes
+    :return: (list of bitarray) containing 64-bit genes of a population member
+    """
+    return unpack_population(np.asarray(chromosome).reshape(1, -1))[0]
+
+
+def pack_population(population):
+    """
+    Function to convert a population from list of list of bitarray form to packed form
+
+    Every gene is read as an integer whose most significant bit is the leftmost bit of the bitarray, whatever the
+    endianness of the bitarray is (the endianness only changes how the bits are stored in its bytes).
+
+    :param population: (list of list of bitarray) containing 64-bit genes of every population member
+    :return: (numpy.ndarray of uint64) of shape (population size, number of genes) containing packed population
+    """
+    n_genes = len(population[0]) if len(population) else 0
+    for member in population:
+        if len(member) != n_genes:
+            raise ValueError("All population members should have the same number of genes")
+        for gene in member:
+            if len(gene) != GENE_BITS:
+                raise ValueError("Only bitarrays of length {} can be packed".format(GENE_BITS))
+    # ba2int() reads the first bit of a little endian bitarray as the least significant one, so genes are made big
+    # endian first, which keeps the order of their bits
+    packed = np.array([ba2int(bitarray(gene, endian="big")) for member in population for gene in member],
+                      dtype=np.uint64)
+    return packed.reshape(len(population), n_genes)
+
+
+def unpack_population(packed):
+    """
+    Function to convert a packed population back to list of list of bitarray form
+
+    :param packed: (numpy.ndarray of uint64) of shape (population size, number of genes) containing packed population
+    :return: (list of list of bitarray) containing 64-bit genes of every population member
+    """
+    packed = np.asarray(packed, dtype=np.uint64)
+    raw = packed.astype(">u8").tobytes()
+    n_bytes = GENE_BITS // 8
+    population = []
+    for i in range(packed.shape[0]):
+        member = []
+        for j in range(packed.shape[1]):
+            start = (i * packed.shape[1] + j) * n_bytes
+            gene = bitarray(endian="big")
+            gene.frombytes(raw[start:start + n_bytes])
+            member.append(gene)
+        population.append(member)
+    return population
+
+# ======================================================================================================================
+# ===== Initialization =================================================================================================
+# ======================================================================================================================
+
+
+def init_packed_population(size, n_of_chromosomes, search_domain_bounds):
+    """
+    Function to initialize random population in packed form
+
+    The genes are random real values drawn uniformly from the search domain, stored as raw IEEE 754 doubles, i.e. the
+    packed population is equivalent to the output of init_population() of b_genetic.py.
+
+    :param size: (int) size of the population
+    :param n_of_chromosomes: (int) number of chromosomes for each population member
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched
+    :return: (numpy.ndarray of uint64) of shape (size, n_of_chromosomes) containing random population
+    """
+    real_population = uniform(search_domain_bounds[0], search_domain_bounds[1], (size, n_of_chromosomes))
+    return encode_population(real_population)
@@ -0,0 +1,437 @@
+# Evaluation of the population on remote worker processes, over TCP
+
+# When one machine is not enough to evaluate a population in reasonable time, the algorithm (coordinator) can ship
+# batches of chromosomes to evaluator processes (workers) running on other machines, and collect their fitness.
+#   RemoteEvaluator :: the coordinator side, an evaluator (see evaluation.py) listening for workers on a TCP port
+#   run_worker() :: the worker side, connects to the coordinator and evaluates the batches it receives
+
+# Usage: start the coordinator in the algorithm, e.g.
+#       with RemoteEvaluator(port=5555) as evaluator:
+#           fitnesses = evaluator(population)
+# and start any number of workers, on any machine which can reach the coordinator, at any time:
+#       python remote_evaluation.py <coordinator host> 5555
+# Workers use fitness and fitness_batch of fitness.py, so every worker machine needs a copy of this directory.
+
+# Protocol: every message is a frame, a fixed 13 bytes header followed by a payload of float64 values:
+#   header :: (uint8) message type, (uint32) batch id, (uint32) number of rows, (uint32) number of columns
+#   payload :: rows x columns little endian float64 values, in row major order
+# Message types:
+#   HELLO (worker -> coordinator) :: sent once after connecting, empty payload
+#   BATCH (coordinator -> worker) :: chromosomes to be evaluated, one chromosome per row
+#   RESULT (worker -> coordinator) :: fitness of every chromosome of the batch, a single column
+#   HEARTBEAT (worker -> coordinator) :: sent every 'heartbeat_interval' seconds while a batch is being evaluated
+#   SHUTDOWN (coordinator -> worker) :: the coordinator is closing, worker should exit
+#   ERROR (worker -> coordinator) :: fitness function raised an exception while evaluating the batch, empty payload
+
+# Batching: population is split into batches which should take at most 'max_batch_time' seconds to evaluate, based on
+# the measured evaluation time per chromosome, so that the latency of a batch (and the work lost with a dead worker) is
+# bounded, while a batch is still large enough to amortize the network round trip.
+
+# Failures: a worker which does not send anything (result or heartbeat) for 'heartbeat_timeout' seconds while
+# evaluating a batch, or whose connection breaks, is dropped, and its batch is dispatched again to another worker. A
+# worker whose fitness function raises an exception replies with ERROR, and stays available for other batches, while the
+# batch is dispatched again as well. A batch which fails 'max_attempts' times is given up: its chromosomes get the worst
+# possible fitness, so that a chromosome crashing the fitness function cannot kill every worker, or stall the algorithm.
+# Only a failure of a batch the worker received counts as an attempt: the connection of an idle worker is checked before
+# a batch is sent to it, and a batch which could not be sent (e.g. to a worker which died while idle) goes back to the
+# queue as it was.
+
+# import necessary libraries
+import math
+import queue
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+import traceback
+
+import numpy as np
+
+from evaluation import evaluate_population
+
+# ======================================================================================================================
+# ===== Framing ========================================================================================================
+# ======================================================================================================================
+
+HELLO, BATCH, RESULT, HEARTBEAT, SHUTDOWN, ERROR = range(6)
+
+# message type, batch id, number of rows, number of columns
+HEADER = struct.Struct("<BIII")
+
+# largest acceptable payload, protects a peer from allocating memory for a corrupt header
+MAX_PAYLOAD_BYTES = 1 << 30
+
+
+class ProtocolError(Exception):
+    """
+    Exception raised when a peer sends a malformed frame
+    """
+
+
+def send_frame(sock, kind, batch_id=0, values=None):
+    """
+    Function to send a frame
+
+    :param sock: (socket.socket) connected socket
+    :param kind: (int) message type
+    :param batch_id: (int) id of the batch the message refers to
+    :param values: (numpy.ndarray) 1 or 2 dimensional payload, converted to little endian float64, empty if not passed
+    """
+    if values is None:
+        values = np.empty((0, 0))
+    values = np.ascontiguousarray(values, dtype="<f8")
+    if values.ndim == 1:
+        values = values.reshape(-1, 1)
+    sock.sendall(HEADER.pack(kind, batch_id, values.shape[0], values.shape[1]) + values.tobytes())
+
+
+def connection_closed(sock):
+    """
+    Function to check, without blocking, whether the peer has closed the connection, or the connection is broken
+
+    :param sock: (socket.socket) connected socket
+    :return: True, if nothing more can be received from the peer, else False
+    """
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        # a closed connection is readable, and has no data to read
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b""
+    except (OSError, ValueError):
+        return True
+
+
+def recv_exact(sock, n):
+    """
+    Function to receive exactly 'n' bytes
+
+    :param sock: (socket.socket) connected socket
+    :param n: (int) number of bytes to be received
+    :return: (bytearray) containing received bytes
+    """
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    received = 0
+    while received < n:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            raise ConnectionError("Connection closed by the peer")
+        received += count
+    return buffer
+
+
+def recv_frame(sock):
+    """
+    Function to receive a frame
+
+    :param sock: (socket.socket) connected socket
+    :return: (tuple) containing (int) message type, (int) batch id, and (numpy.ndarray of float64) payload of shape
+             (rows, columns)
+    """
+    kind, batch_id, rows, cols = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if kind > ERROR or rows * cols * 8 > MAX_PAYLOAD_BYTES:
+        raise ProtocolError("Malformed frame header: type {}, {} x {} values".format(kind, rows, cols))
+    payload = recv_exact(sock, rows * cols * 8)
+    return kind, batch_id, np.frombuffer(payload, dtype="<f8").astype(np.float64).reshape(rows, cols)
+
+# ======================================================================================================================
+# ===== Coordinator ====================================================================================================
+# ======================================================================================================================
+
+
+class _Job:
+    """
+    Evaluation of one population, split into batches
+    """
+
+    def __init__(self, n, n_batches):
+        self.fitnesses = np.empty(n, dtype=np.float64)
+        self.remaining = n_batches
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        if n_batches == 0:
+            self.done.set()
+
+    def complete(self, start, fitnesses):
+        self.fitnesses[start:start + len(fitnesses)] = fitnesses
+        with self.lock:
+            self.remaining -= 1
+            if self.remaining == 0:
+                self.done.set()
+
+
+class RemoteEvaluator:
+    """
+    Evaluator shipping batches of the population to remote workers over TCP (refer the comments above)
+
+    Population is sent as float64 values, i.e. decoded real values of genes (see b_genetic.py), or real valued vectors.
+    The evaluator waits for workers if none is connected, workers may join and leave at any time.
+
+    :param host: (string) address to listen on, all interfaces if not passed
+    :param port: (int) port to listen on, a free port is chosen if not passed (see 'address')
+    :param max_batch_size: (int) maximum number of chromosomes in a batch
+    :param max_batch_time: (float) target maximum time in seconds to evaluate a batch
+    :param heartbeat_timeout: (float) time in seconds after which a silent worker is considered dead
+    :param timeout: (float) maximum time in seconds to evaluate a population, raises TimeoutError when exceeded, no
+                    limit if not passed
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem,
+                 used to choose the worst possible fitness
+    :param max_attempts: (int) maximum number of times a batch is dispatched, before it is given up
+    :param failure_fitness: (float) fitness of the chromosomes of a batch which is given up, +inf for "min" and -inf for
+                            "max" if not passed
+    """
+
+    def __init__(self, host="", port=0, max_batch_size=256, max_batch_time=0.5, heartbeat_timeout=5.0, timeout=None,
+                 mode="min", max_attempts=3, failure_fitness=None):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        self.max_batch_size = max_batch_size
+        self.max_batch_time = max_batch_time
+        self.heartbeat_timeout = heartbeat_timeout
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        if failure_fitness is None:
+            failure_fitness = np.inf if mode == "min" else -np.inf
+        self.failure_fitness = failure_fitness
+        # measured evaluation time per chromosome on a worker, unknown until the first result
+        self.time_per_member = None
+        self.n_redispatched = 0
+        self.n_failed_batches = 0
+
+        self.pending = queue.Queue()
+        self.workers = set()
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.next_batch_id = 0
+
+        self.server = socket.create_server((host, port))
+        self.server.settimeout(0.1)
+        self.address = self.server.getsockname()[:2]
+        self.acceptor = threading.Thread(target=self._accept, daemon=True)
+        self.acceptor.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def n_workers(self):
+        """
+        Number of connected workers
+        """
+        with self.lock:
+            return len(self.workers)
+
+    def close(self):
+        """
+        Method to stop accepting workers, and ask the connected workers to shut down
+        """
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        self.acceptor.join()
+        self.server.close()
+        with self.lock:
+            workers = list(self.workers)
+        for thread in workers:
+            thread.join()
+
+    def batch_size(self, n):
+        """
+        Method to calculate the number of chromosomes in a batch, for a population of 'n' chromosomes
+
+        :param n: (int) size of the population
+        :return: (int) number of chromosomes in a batch
+        """
+        # an equal share of every worker at most, so that all of them are busy
+        size = min(self.max_batch_size, math.ceil(n / max(self.n_workers, 1)))
+        # but no longer than the latency bound
+        if self.time_per_member:
+            size = min(size, math.floor(self.max_batch_time / self.time_per_member))
+        return max(size, 1)
+
+    def __call__(self, population):
+        population = np.ascontiguousarray(population, dtype=np.float64)
+        if population.ndim == 1:
+            population = population.reshape(-1, 1)
+        n = len(population)
+        size = self.batch_size(n)
+        starts = range(0, n, size)
+        job = _Job(n, len(starts))
+        with self.lock:
+            for start in starts:
+                self.pending.put((job, self.next_batch_id, start, population[start:start + size], 0))
+                self.next_batch_id = (self.next_batch_id + 1) % (1 << 32)
+        if not job.done.wait(self.timeout):
+            # batches still in the queue are dropped by the workers
+            job.cancelled = True
+            raise TimeoutError("Population was not evaluated within {} seconds".format(self.timeout))
+        return job.fitnesses
+
+    def _retry(self, batch, attempted=True):
+        """
+        Method to dispatch a failed batch again, or to give it up after 'max_attempts' attempts
+
+        :param batch: (tuple) containing the job, batch id, start index, chromosomes and number of failed attempts
+        :param attempted: (bool) True, if the batch was received by the worker, i.e. the failure counts as an attempt
+        """
+        job, batch_id, start, rows, attempts = batch
+        if attempted:
+            attempts += 1
+        with self.lock:
+            give_up = attempts >= self.max_attempts
+            if give_up:
+                self.n_failed_batches += 1
+            else:
+                self.n_redispatched += 1
+        if give_up:
+            job.complete(start, np.full(len(rows), self.failure_fitness))
+        else:
+            self.pending.put((job, batch_id, start, rows, attempts))
+
+    def _accept(self):
+        """
+        Method accepting new workers, running on its own thread
+        """
+        while not self.closed.is_set():
+            try:
+                sock, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            thread = threading.Thread(target=self._serve, args=(sock,), daemon=True)
+            with self.lock:
+                self.workers.add(thread)
+            thread.start()
+
+    def _serve(self, sock):
+        """
+        Method feeding batches to a single worker, running on its own thread
+
+        :param sock: (socket.socket) connection to the worker
+        """
+        sock.settimeout(self.heartbeat_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        batch = None
+        # whether the batch was sent to the worker
+        sent = False
+        try:
+            kind, _, _ = recv_frame(sock)
+            if kind != HELLO:
+                raise ProtocolError("Worker should say HELLO first")
+            while not self.closed.is_set():
+                try:
+                    batch = self.pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                job, batch_id, start, rows, _ = batch
+                if job.cancelled:
+                    batch = None
+                    continue
+                # a worker which died while idle is found before its batch is sent
+                if connection_closed(sock):
+                    raise ConnectionError("Connection closed by the worker")
+                start_time = time.perf_counter()
+                send_frame(sock, BATCH, batch_id, rows)
+                sent = True
+                # every frame (heartbeat or result) resets the timeout of the socket
+                while True:
+                    kind, received_id, values = recv_frame(sock)
+                    if kind in (RESULT, ERROR) and received_id == batch_id:
+                        break
+                    if kind != HEARTBEAT:
+                        raise ProtocolError("Unexpected message of type {} from worker".format(kind))
+                if kind == ERROR:
+                    # fitness function failed, the worker itself is fine
+                    self._retry(batch)
+                    batch, sent = None, False
+                    continue
+                if values.size != len(rows):
+                    raise ProtocolError("Worker returned {} fitnesses for {} chromosomes".format(values.size, len(rows)))
+                self.time_per_member = (time.perf_counter() - start_time) / len(rows)
+                job.complete(start, values.ravel())
+                batch, sent = None, False
+            send_frame(sock, SHUTDOWN)
+        except (OSError, ProtocolError):
+            # worker is dead or misbehaving, its batch goes back to the queue for another worker, a batch which was not
+            # sent does not count as an attempt
+            if batch is not None:
+                self._retry(batch, sent)
+        finally:
+            sock.close()
+            with self.lock:
+                self.workers.discard(threading.current_thread())
+
+# ======================================================================================================================
+# ===== Worker =========================================================================================================
+# ======================================================================================================================
+
+
+def run_worker(host, port, fitness, fitness_batch=None, heartbeat_interval=1.0):
+    """
+    Function to run an evaluation worker, until the coordinator shuts it down or the connection breaks
+
+    :param host: (string) address of the coordinator
+    :param port: (int) port of the coordinator
+    :param fitness: (function) to calculate fitness of a single chromosome
+    :param fitness_batch: (function) to calculate fitness of a whole batch in one call, preferred over 'fitness' if
+                          passed
+    :param heartbeat_interval: (float) time in seconds between heartbeats while a batch is being evaluated, should be
+                               well below 'heartbeat_timeout' of the coordinator
+    :return: (int) number of evaluated batches, including the ones whose evaluation failed
+    """
+    n_batches = 0
+    with socket.create_connection((host, port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_lock = threading.Lock()
+        send_frame(sock, HELLO)
+        while True:
+            try:
+                kind, batch_id, rows = recv_frame(sock)
+            except ConnectionError:
+                return n_batches
+            if kind != BATCH:
+                return n_batches
+
+            # heartbeats are sent from another thread while this one evaluates the batch
+            evaluated = threading.Event()
+
+            def beat():
+                while not evaluated.wait(heartbeat_interval):
+                    with send_lock:
+                        if evaluated.is_set():
+                            return
+                        try:
+                            send_frame(sock, HEARTBEAT, batch_id)
+                        except OSError:
+                            return
+
+            threading.Thread(target=beat, daemon=True).start()
+            try:
+                fitnesses = evaluate_population(rows, fitness, fitness_batch)
+            except Exception:
+                # report the failure, and keep serving
+                traceback.print_exc()
+                fitnesses = None
+            finally:
+                with send_lock:
+                    evaluated.set()
+            with send_lock:
+                if fitnesses is None:
+                    send_frame(sock, ERROR, batch_id)
+                else:
+                    send_frame(sock, RESULT, batch_id, fitnesses)
+            n_batches += 1
+
+
+if __name__ == "__main__":
+    from fitness import fitness, fitness_batch
+
+    if len(sys.argv) != 3:
+        sys.exit("usage: python remote_evaluation.py <coordinator host> <coordinator port>")
+    run_worker(sys.argv[1], int(sys.argv[2]), fitness, fitness_batch)
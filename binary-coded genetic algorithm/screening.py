@@ -0,0 +1,78 @@
+# Screening of decoded population members before fitness evaluation
+
+# With raw IEEE 754 double encoding (see number_system_converter.py), a bit flip of mutation, or a crossover point
+# inside the exponent field, can produce NaN, +/- infinity, or values far outside of the search domain. Such members
+# should never reach the fitness function, which may be expensive. The screening stage checks the whole decoded
+# population in one pass, and then either repairs the offending genes, or marks the members invalid, so that they are
+# not evaluated at all.
+
+# Screening strategies:
+#   "clamp" :: out of bounds genes are set to the nearest bound (-inf to lower bound, +inf to upper bound), NaN genes
+#              have no nearest bound, so they are resampled uniformly within the search domain
+#   "resample" :: offending genes are resampled uniformly within the search domain
+#   "invalid" :: genes are left as they are, and members having any offending gene are marked invalid
+
+# import necessary libraries
+
+import numpy as np
+
+from random_numbers import get_rng
+
+# ======================================================================================================================
+# ===== Screening functions ============================================================================================
+# ======================================================================================================================
+
+
+def find_offending_genes(decoded, search_domain_bounds):
+    """
+    Function to find the genes which are not finite, or are outside of the search domain
+
+    NaN is not comparable to anything, so a single pair of comparisons catches NaN, infinities and out of bounds values.
+
+    :param decoded: (numpy.ndarray of float64) of shape (population size, number of genes) containing decoded population
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene
+    :return: (numpy.ndarray of bool) of the same shape as 'decoded', True for offending genes
+    """
+    return ~((decoded >= search_domain_bounds[0]) & (decoded <= search_domain_bounds[1]))
+
+
+def screen_population(decoded, search_domain_bounds, strategy="clamp", rng=None):
+    """
+    Function to screen the decoded population, and repair the offending genes in place, or mark the members invalid
+
+    NOTE: Decoded population of raw double encoding shares memory with the packed population, so repairing it in place
+          repairs the packed population as well. For other encodings, repaired values should be encoded again.
+
+    :param decoded: (numpy.ndarray of float64) of shape (population size, number of genes) containing decoded
+                    population, repaired in place
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene
+    :param strategy: (string) screening strategy, pass: "clamp", "resample" or "invalid" (refer the comments above)
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (tuple) containing (numpy.ndarray of bool) of shape (population size,), True for valid members, and
+             (bool) True if any gene was repaired
+    """
+    rng = get_rng(rng)
+    if strategy not in ("clamp", "resample", "invalid"):
+        raise ValueError("Incorrect strategy selected, please pass 'clamp', 'resample' or 'invalid' as strategy")
+
+    offending = find_offending_genes(decoded, search_domain_bounds)
+    if not offending.any():
+        return np.ones(len(decoded), dtype=bool), False
+    if strategy == "invalid":
+        return ~offending.any(axis=1), False
+
+    # broadcast bounds to the offending genes
+    lower = np.broadcast_to(search_domain_bounds[0], decoded.shape)[offending]
+    upper = np.broadcast_to(search_domain_bounds[1], decoded.shape)[offending]
+    values = decoded[offending]
+    if strategy == "clamp":
+        resample = np.isnan(values)
+        values = np.clip(values, lower, upper)
+    else:
+        resample = np.ones(len(values), dtype=bool)
+    values[resample] = rng.uniform(lower[resample], upper[resample])
+    decoded[offending] = values
+    return np.ones(len(decoded), dtype=bool), True
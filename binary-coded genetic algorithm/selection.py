@@ -6,10 +6,14 @@
 # import necessary libraries
 
 import numpy as np
+import heapq
 import math
 from bitarray import bitarray
 
-from fitness import fitness
+from evaluation import evaluate_population
+from fitness import fitness, fitness_batch
+from random_numbers import distinct_indices, get_rng
+from population import is_packed
 
 # ======================================================================================================================
 # ===== Helper Functions ===============================================================================================
@@ -20,19 +24,15 @@ def unique_rn_generator(low, high, n):
     """
     Function to generate a list of unique random integers
 
-    This function uses numpy's random number generator to generate a list of random numbers, checks if all the numbers
-    in the list are unique, if they are unique, the list is returned. If they are not unique, then the list is generated
-    repeatedly until a list with unique numbers is generated.
+    The numbers are drawn without repetition in the first place (see distinct_indices() of random_numbers.py), instead
+    of regenerating the list until it has no repetitions, which may take very long when 'n' is close to high - low.
 
     :param low: (int) lowest (inclusive) acceptable random number
     :param high: (int) highest (not inclusive) acceptable random number
     :param n: (int) number of random numbers to be generated
     :return: (list) containing 'n' unique random numbers
     """
-    r = np.random.randint(low, high, n)
-    while len(r) != len(set(r)):
-        r = np.random.randint(low, high, n)
-    return r
+    return distinct_indices(low, high, n)
 
 
 def round_up_to_even(f):
@@ -46,15 +46,150 @@ def round_up_to_even(f):
     """
     return int(math.ceil(f / 2.) * 2)
 
+
+def evaluate(population, evaluator=None):
+    """
+    Function to calculate fitness of every population member, exactly once
+
+    :param population: population whose fitness is to be calculated
+    :param evaluator: evaluator of the population (see evaluation.py), fitness and fitness_batch of fitness.py are used
+                      if not passed
+    :return: (numpy.ndarray of float64) containing fitness of each population member
+    """
+    if evaluator is not None:
+        return evaluator(population)
+    return evaluate_population(population, fitness, fitness_batch)
+
+
+class FenwickTree:
+    """
+    Fenwick tree (binary indexed tree) over non-negative weights, for fitness proportional sampling without replacement
+
+    The tree stores partial sums of the weights, so that both changing a weight and finding the member at a given
+    cumulative weight take O(log n) time, instead of recomputing the sum and scanning the partial sums, which take O(n).
+
+    :param weights: (list or numpy.ndarray) containing non-negative weight of each member
+    """
+
+    def __init__(self, weights):
+        self.weights = [float(w) for w in weights]
+        self.n = len(self.weights)
+        self.total = math.fsum(self.weights)
+        # number of members with non-zero weight, 'total' keeps a rounding residue once all of them are removed
+        self.n_positive = sum(w > 0 for w in self.weights)
+        # build the tree in O(n): every node adds its partial sum to its parent
+        self.tree = [0.0] + self.weights
+        for i in range(1, self.n + 1):
+            j = i + (i & -i)
+            if j <= self.n:
+                self.tree[j] += self.tree[i]
+        # highest power of 2 not greater than n, where the search starts
+        self.top = 1 << (self.n.bit_length() - 1) if self.n else 0
+
+    def remove(self, i):
+        """
+        Method to set the weight of i'th member to zero, i.e. remove it from further sampling
+
+        :param i: (int) index of the member
+        """
+        delta = -self.weights[i]
+        if delta < 0:
+            self.n_positive -= 1
+        self.weights[i] = 0.0
+        self.total += delta
+        i += 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, u):
+        """
+        Method to find the member at cumulative weight 'u', i.e. the first member whose partial sum exceeds 'u'
+
+        :param u: (float) cumulative weight, should be between 0 and total weight
+        :return: (int) index of the member
+        """
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] <= u:
+                pos = nxt
+                u -= self.tree[nxt]
+            step >>= 1
+        # guard against rounding errors of the partial sums: fall back to the last member with non-zero weight
+        if pos >= self.n or self.weights[pos] == 0:
+            pos = max(i for i in range(self.n) if self.weights[i] > 0)
+        return pos
+
+
+def proportional_weights(fitnesses, mode, scaling="shift"):
+    """
+    Function to turn fitnesses into non-negative weights, for fitness proportional selection
+
+    Scaling strategies:
+        "shift" :: weight = fitness - worst fitness (for maximization), or worst fitness - fitness (for minimization),
+                   so that negative fitness values work, and the worst member gets zero weight.
+        "none"  :: weight = fitness, only for maximization of non-negative fitness values.
+    Non-finite fitness values (e.g. members which could not be evaluated) get zero weight. If all the weights are zero,
+    i.e. all the members are equally fit, all of them get equal weights.
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param scaling: (string) scaling strategy, pass: "shift" or "none" (refer the description above)
+    :return: (numpy.ndarray of float64) containing weight of each population member
+    """
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    if mode == "max":
+        weights = fitnesses.copy()
+    elif mode == "min":
+        weights = -fitnesses
+    else:
+        raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+
+    finite = np.isfinite(weights)
+    weights[~finite] = 0
+    if scaling == "shift":
+        if finite.any():
+            weights[finite] -= weights[finite].min()
+    elif scaling == "none":
+        if mode == "min" or (weights < 0).any():
+            raise ValueError("Scaling 'none' works only for maximization of non-negative fitness values")
+    else:
+        raise ValueError("Incorrect scaling selected, please pass 'shift' or 'none' as scaling")
+
+    if not weights.any():
+        weights[:] = 1
+    return weights
+
 # ======================================================================================================================
 # ===== Selection Algorithms ===========================================================================================
 # ======================================================================================================================
 
 
-def tournament_selection(population, cp, k, mode):
+def tournament_selection(population, cp, k, mode, evaluator=None):
     """
     This function is an implementation of tournament selection algorithm
 
+    Fitness of every population member is calculated exactly once (in one call, if fitness_batch is defined in
+    fitness.py), and the tournaments are held over these fitnesses (see tournament_selection_from_fitness()).
+
+    :param population: (list of bitarray or numpy.ndarray of uint64) containing chromosomes(bitarray) represented by
+                       genes(bit), or packed population (see population.py)
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param k: (int) number of members allowed to participate in each tournament that is held
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param evaluator: evaluator of the population (see evaluation.py), e.g. ProcessPoolEvaluator to calculate fitness
+                      in parallel, fitness and fitness_batch of fitness.py are used if not passed
+    :return: (list) containing indices of selected chromosomes from the population
+    """
+    return tournament_selection_from_fitness(evaluate(population, evaluator), cp, k, mode)
+
+
+def tournament_selection_from_fitness(fitnesses, cp, k, mode):
+    """
+    This function is an implementation of tournament selection algorithm, over precomputed fitness of the population
+
     Runs a "tournament" among a few individuals chosen at random from the population and selects the winner (the one
     with the best fitness) for crossover
 
@@ -64,7 +199,7 @@ def tournament_selection(population, cp, k, mode):
     Selection pressure can be easily adjusted by changing the tournament size 'k'.
     Deterministic tournament selection selects the best individual in each tournament.
 
-    :param population: (list of bitarray) containing chromosomes(bitarray) represented by genes(bit)
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
     :param cp: (float) crossover probability, typically should be between 0.8 and 1
     :param k: (int) number of members allowed to participate in each tournament that is held
     :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
@@ -82,23 +217,20 @@ def tournament_selection(population, cp, k, mode):
     # list that will keep track of selected indices, so that selection is done without replacement.
     selected_indices = []
     # number of parents to be selected
-    n = round_up_to_even(len(population)*cp)
-    # create a copy of original population alongwith their respective indices, because we will be removing winner of
+    n = round_up_to_even(len(fitnesses)*cp)
+    # create a copy of original fitnesses alongwith their respective indices, because we will be removing winner of
     # tournament from this array, and we need to preserve original indices of population members.
-    numbered_population = [[l, m] for l, m in zip(population, range(len(population)))]
+    numbered_fitnesses = [[l, m] for l, m in zip(fitnesses, range(len(fitnesses)))]
     # start selecting parents for crossover
     for i in range(n):
         # Generate k unique random numbers
-        if k < len(numbered_population):
-            r = unique_rn_generator(0, len(numbered_population), k)
+        if k < len(numbered_fitnesses):
+            r = unique_rn_generator(0, len(numbered_fitnesses), k)
         # However, if the list is exhausted, i.e there are less than k unique members left, repetition is allowed
-        elif k >= len(numbered_population):
-            r = np.random.randint(0, len(numbered_population), k)
-        # empty list to store fitnesses of tournament participator members
-        fitnesses = []
-        # calculate fitness of each tournament paticipator and append it to fitnesses list
-        for a in r:
-            fitnesses.append(fitness(numbered_population[a][0]))
+        elif k >= len(numbered_fitnesses):
+            r = get_rng().integers(0, len(numbered_fitnesses), k)
+        # list of fitnesses of tournament participator members
+        participant_fitnesses = [numbered_fitnesses[a][0] for a in r]
         # Assume that index 0 is the fittest tournament participator, so set index = 0
         index = 0
         # Compare fitness of each tournament participator with fitness of participator on whom index is  currently
@@ -106,55 +238,221 @@ def tournament_selection(population, cp, k, mode):
         # if problem is of maximization
         if flag:
             for j in range(len(r)):
-                if fitnesses[index] < fitnesses[j]:
+                if participant_fitnesses[index] < participant_fitnesses[j]:
                     index = j
         # if problem is of minimization
         else:
             for j in range(len(r)):
-                if fitnesses[index] > fitnesses[j]:
+                if participant_fitnesses[index] > participant_fitnesses[j]:
                     index = j
 
         # Copy the original position of winner, and update it to selected_indices list
-        winner = numbered_population[r[index]][1]
+        winner = numbered_fitnesses[r[index]][1]
         selected_indices.append(winner)
-        # delete the winner from the numbered_population, i.e. ban it from further entering the tournament
-        del numbered_population[r[index]]
+        # delete the winner from the numbered_fitnesses, i.e. ban it from further entering the tournament
+        del numbered_fitnesses[r[index]]
+
+    return selected_indices
+
+
+def batch_tournament_selection(fitnesses, cp, k, mode, rng=None):
+    """
+    This function is a vectorized implementation of tournament selection algorithm, over precomputed fitness of the
+    population
+
+    As in tournament_selection(), selection is done without replacement: a winner of a tournament is banned from
+    further entering the tournaments, and if there are less than 'k' members left, repetition of participants is
+    allowed. Instead of holding the tournaments one by one, they are held in rounds:
+
+    Algorithm:
+    --[1] Draw the participants of all the remaining tournaments in one go, as a matrix of shape
+          (number of tournaments, k) of indices of members which have not been selected yet, with unique indices in
+          each row.
+    --[2] Pick the winner of every tournament with argmin/argmax along the rows.
+    --[3] If a member won more than one tournament, only its first win counts, the other tournaments are held again in
+          the next round, among the members which have not been selected yet.
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param k: (int) number of members allowed to participate in each tournament that is held
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (numpy.ndarray of int) containing indices of selected chromosomes from the population
+    """
+    rng = get_rng(rng)
+
+    # check whether to minimize or maximize
+    if mode == "min":
+        pick = np.argmin
+    elif mode == "max":
+        pick = np.argmax
+    else:
+        raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
+    # number of parents to be selected
+    n = round_up_to_even(len(fitnesses) * cp)
+    if n > len(fitnesses):
+        raise ValueError("Cannot select {} parents from a population of {} members".format(n, len(fitnesses)))
+
+    selected_indices = np.empty(0, dtype=np.int64)
+    # indices of members which have not been selected yet
+    available = np.arange(len(fitnesses))
+    while len(selected_indices) < n:
+        n_tournaments = n - len(selected_indices)
+        # draw participants of all the tournaments, repetition is allowed only if less than k members are left
+        if k < len(available):
+            r = distinct_indices(0, len(available), k, n_tournaments, rng=rng)
+        else:
+            r = (rng.random((n_tournaments, k)) * len(available)).astype(np.int64)
+        participants = available[r]
+        winners = participants[np.arange(n_tournaments), pick(fitnesses[participants], axis=1)]
+        # only the first win of every member counts
+        _, first_wins = np.unique(winners, return_index=True)
+        winners = winners[np.sort(first_wins)]
+        selected_indices = np.concatenate((selected_indices, winners))
+        available = np.setdiff1d(available, winners, assume_unique=True)
 
     return selected_indices
 
 
-def rank_selection(population, mode):
+def rank_selection(population, mode, evaluator=None):
     """
     This function is an implementation of rank selection algorithm
 
     Rank selection first ranks the population and then every chromosome receives fitness from this ranking. Here,
     selection is based on this ranking rather than absolute differences in fitness.
 
-    :param population: (list of bitarray) containing chromosomes(bitarray) represented by genes(bit)
+    :param population: (list of bitarray or numpy.ndarray of uint64) containing chromosomes(bitarray) represented by
+                       genes(bit), or packed population (see population.py)
     :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
-    :return: (list of bitarray) containing original chromosomes, but ranked in order according to their fitness
+    :param evaluator: evaluator of the population (see evaluation.py), e.g. ProcessPoolEvaluator to calculate fitness
+                      in parallel, fitness and fitness_batch of fitness.py are used if not passed
+    :return: (list of bitarray or numpy.ndarray of uint64) containing original chromosomes, but ranked in order
+             according to their fitness
+    """
+
+    # calculate fitness of all population members, and rank them according to their fitness
+    order = rank_selection_from_fitness(evaluate(population, evaluator), mode)
+
+    # packed population is reordered as a whole
+    if is_packed(population):
+        return population[order]
+    return [population[i] for i in order]
+
+
+def rank_selection_from_fitness(fitnesses, mode):
     """
+    This function is an implementation of rank selection algorithm, over precomputed fitness of the population
 
-    # calculate fitness of all population members and store it in a new list fitnesses
-    fitnesses = [fitness(i) for i in population]
+    Population members are ranked according to their fitness, depending on whether it is minimization or maximization,
+    ascending or descending. Only the fitnesses are sorted (numpy.argsort), so that chromosomes are never compared with
+    each other on ties, and members with equal fitness keep their original order.
 
-    # now we have fitness of each population member, rank them according to their fitness, i.e. sort the population list
-    # according to the fitness values of population members, depending on whether it is minimization or maximization,
-    # sort ascending or descending.
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :return: (numpy.ndarray of int) containing indices of population members, ranked in order according to their
+             fitness (best first)
+    """
+    fitnesses = np.asarray(fitnesses, dtype=np.float64)
 
     # check whether to minimize or maximize
     if mode == "max":
-        return [i for _, i in sorted(zip(fitnesses, population), reverse=True)]
+        return np.argsort(-fitnesses, kind="stable")
     elif mode == "min":
-        return [i for _, i in sorted(zip(fitnesses, population), reverse=False)]
+        return np.argsort(fitnesses, kind="stable")
     else:
         raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
 
 
-def roulette_wheel_selection(population, cp):
+def ranking_probabilities(fitnesses, mode, scheme="linear", pressure=1.5, base=0.99):
+    """
+    Function to calculate selection probability of each population member from its rank
+
+    Members are ranked from 0 (the worst) to N - 1 (the best), where N is the size of population, and:
+        "linear" :: p(rank) = (2 - s) / N + 2 * rank * (s - 1) / (N * (N - 1)), where s = pressure, between 1 and 2, is
+                    the expected number of selections of the best member (1: no pressure, 2: the worst is never selected)
+        "exponential" :: p(rank) = c^(N - 1 - rank) * (1 - c) / (1 - c^N), where c = base, between 0 and 1, is the
+                         ratio of probabilities of neighbouring ranks (smaller c: higher pressure)
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param scheme: (string) ranking scheme, pass: "linear" or "exponential"
+    :param pressure: (float) selection pressure 's' of linear ranking, should be between 1 and 2
+    :param base: (float) base 'c' of exponential ranking, should be between 0 and 1
+    :return: (numpy.ndarray of float64) containing selection probability of each population member
+    """
+    n = len(fitnesses)
+    # rank of each member, 0 for the worst member
+    ranks = np.empty(n, dtype=np.float64)
+    ranks[rank_selection_from_fitness(fitnesses, mode)[::-1]] = np.arange(n)
+
+    if scheme == "linear":
+        if not 1 <= pressure <= 2:
+            raise ValueError("Pressure of linear ranking should be between 1 and 2, got {}".format(pressure))
+        if n == 1:
+            return np.ones(1)
+        return (2 - pressure) / n + 2 * ranks * (pressure - 1) / (n * (n - 1))
+    elif scheme == "exponential":
+        if not 0 < base < 1:
+            raise ValueError("Base of exponential ranking should be between 0 and 1, got {}".format(base))
+        probabilities = base ** (n - 1 - ranks)
+        return probabilities / probabilities.sum()
+    else:
+        raise ValueError("Incorrect scheme selected, please pass 'linear' or 'exponential' as scheme")
+
+
+def rank_based_selection(fitnesses, cp, mode, scheme="linear", pressure=1.5, base=0.99, rng=None):
+    """
+    This function is an implementation of rank based selection algorithm, over precomputed fitness of the population
+
+    Unlike rank_selection(), which just returns the ranked population, this function selects the parents: every member
+    gets a selection probability from its rank (see ranking_probabilities()), so selection depends on the order of
+    fitnesses rather than their absolute differences, and all the parents are drawn in one vectorized call.
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param scheme: (string) ranking scheme, pass: "linear" or "exponential"
+    :param pressure: (float) selection pressure 's' of linear ranking, should be between 1 and 2
+    :param base: (float) base 'c' of exponential ranking, should be between 0 and 1
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (numpy.ndarray of int) containing indices of selected chromosomes from the population (with replacement)
+    """
+    rng = get_rng(rng)
+    cumulative = np.cumsum(ranking_probabilities(fitnesses, mode, scheme, pressure, base))
+    # number of parents to be selected
+    n = round_up_to_even(len(cumulative) * cp)
+    r = rng.random(n) * cumulative[-1]
+    return np.minimum(np.searchsorted(cumulative, r, side="right"), len(cumulative) - 1)
+
+
+def roulette_wheel_selection(population, cp, evaluator=None):
     """
     This function is implementation of roulette wheel selection algorithm
 
+    Fitness of every population member is calculated exactly once (in one call, if fitness_batch is defined in
+    fitness.py), and the wheel is spun over these fitnesses (see roulette_wheel_selection_from_fitness()).
+
+    WARNING: This algorithm will fail where fitness can take a negative value, and maximum crossover probability should
+             be less than 0.95
+
+    :param population: (list of bitarray or numpy.ndarray of uint64) containing chromosomes(bitarray) represented by
+                       genes(bit), or packed population (see population.py)
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param evaluator: evaluator of the population (see evaluation.py), e.g. ProcessPoolEvaluator to calculate fitness
+                      in parallel, fitness and fitness_batch of fitness.py are used if not passed
+    :return: (list) containing indices of selected chromosomes from the population
+    """
+    return roulette_wheel_selection_from_fitness(evaluate(population, evaluator), cp)
+
+
+def roulette_wheel_selection_from_fitness(fitnesses, cp):
+    """
+    This function is implementation of roulette wheel selection algorithm, over precomputed fitness of the population
+
     Algorithm:
     --[1] Calculate S = the sum of all finesses.
     --[2] Generate a random number between 0 and S.
@@ -164,16 +462,16 @@ def roulette_wheel_selection(population, cp):
     WARNING: This algorithm will fail where fitness can take a negative value, and maximum crossover probability should
              be less than 0.95
 
-    :param population: (list of bitarray) containing chromosomes(bitarray) represented by genes(bit)
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
     :param cp: (float) crossover probability, typically should be between 0.8 and 1
     :return: (list) containing indices of selected chromosomes from the population
     """
     # list that will keep track of selected indices, so that selection is done without replacement.
     selected_indices = []
     # number of parents to be selected
-    n = round_up_to_even(len(population) * cp)
+    n = round_up_to_even(len(fitnesses) * cp)
     # create a list of population fitness, alongwith original index of population member corresponding to that fitness
-    fitness_wIndices = [[fitness(l), m] for l, m in zip(population, range(len(population)))]
+    fitness_wIndices = [[l, m] for l, m in zip(fitnesses, range(len(fitnesses)))]
     # initialize a variable for keeping track of sum of fitnesses
     fitness_sum = 0
     # start selecting parents for crossover
@@ -182,7 +480,7 @@ def roulette_wheel_selection(population, cp):
         for j in fitness_wIndices:
             fitness_sum = fitness_sum + j[0]
         # generate a random number between 0 and S.
-        r = int(np.random.randint(0, fitness_sum, 1))
+        r = get_rng().uniform(0, fitness_sum)
         # Initializing variable for storing partial sums
         partial_sum = 0
         # starting from the top of the population, keep adding the finesses to the partial sum P, till P < S.
@@ -198,3 +496,192 @@ def roulette_wheel_selection(population, cp):
         fitness_sum = 0
 
     return selected_indices
+
+
+def fitness_proportional_selection(fitnesses, cp, mode, replace=False, scaling="shift", rng=None):
+    """
+    This function is an O(n log n) implementation of roulette wheel (fitness proportional) selection algorithm, over
+    precomputed fitness of the population
+
+    Algorithm:
+    --[1] Turn fitnesses into non-negative weights (see proportional_weights()).
+    --[2] With replacement: compute cumulative sums of the weights once, generate all the random numbers between 0 and
+          S = sum of weights in one go, and find the selected members by binary search (numpy.searchsorted).
+    --[3] Without replacement (as in roulette_wheel_selection()): keep the weights in a Fenwick tree, and after each
+          selection, set the weight of the selected member to zero. Once all the remaining members have zero weight,
+          they get equal weights.
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param replace: (bool) True, if a member can be selected more than once
+    :param scaling: (string) scaling strategy of fitnesses, pass: "shift" or "none" (see proportional_weights())
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (numpy.ndarray of int) containing indices of selected chromosomes from the population
+    """
+    rng = get_rng(rng)
+    weights = proportional_weights(fitnesses, mode, scaling)
+    # number of parents to be selected
+    n = round_up_to_even(len(weights) * cp)
+
+    if replace:
+        cumulative = np.cumsum(weights)
+        r = rng.random(n) * cumulative[-1]
+        return np.minimum(np.searchsorted(cumulative, r, side="right"), len(weights) - 1)
+
+    if n > len(weights):
+        raise ValueError("Cannot select {} parents from a population of {} members".format(n, len(weights)))
+    tree = FenwickTree(weights)
+    selected_indices = np.empty(n, dtype=np.int64)
+    for i, r in enumerate(rng.random(n)):
+        # all the remaining members have zero weight, give them equal weights
+        if tree.n_positive == 0:
+            remaining = np.ones(len(weights))
+            remaining[selected_indices[:i]] = 0
+            tree = FenwickTree(remaining)
+        selected_indices[i] = tree.find(r * tree.total)
+        tree.remove(selected_indices[i])
+    return selected_indices
+
+
+def stochastic_universal_sampling(fitnesses, cp, mode, scaling="shift", rng=None):
+    """
+    This function is an implementation of stochastic universal sampling, over precomputed fitness of the population
+
+    Instead of spinning the roulette wheel once for every parent, a wheel with 'n' equally spaced pointers is spun
+    once, so all the parents are drawn in one pass, and the number of times a member is selected never differs from its
+    expected value by more than one.
+
+    Algorithm:
+    --[1] Turn fitnesses into non-negative weights (see proportional_weights()), and compute their cumulative sums.
+    --[2] Generate one random number r between 0 and S/n, where S = sum of weights, and place the pointers at
+          r, r + S/n, r + 2S/n, ...
+    --[3] Find the members under the pointers by binary search (numpy.searchsorted), and shuffle them, so that the
+          mating pairs are random.
+
+    :param fitnesses: (list or numpy.ndarray) containing fitness of each population member
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param scaling: (string) scaling strategy of fitnesses, pass: "shift" or "none" (see proportional_weights())
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is
+                used if not passed
+    :return: (numpy.ndarray of int) containing indices of selected chromosomes from the population
+    """
+    rng = get_rng(rng)
+    weights = proportional_weights(fitnesses, mode, scaling)
+    # number of parents to be selected
+    n = round_up_to_even(len(weights) * cp)
+
+    cumulative = np.cumsum(weights)
+    spacing = cumulative[-1] / n
+    pointers = (rng.random() + np.arange(n)) * spacing
+    selected_indices = np.minimum(np.searchsorted(cumulative, pointers, side="right"), len(weights) - 1)
+    return rng.permutation(selected_indices)
+
+# ======================================================================================================================
+# ===== Survivor selection =============================================================================================
+# ======================================================================================================================
+
+
+def survivor_selection(parent_fitnesses, offspring_fitnesses, mode, method="partition"):
+    """
+    This function is an implementation of elitist (mu + lambda) survivor selection, over precomputed fitness of the
+    population (parents) and the children (offspring)
+
+    The best len(parent_fitnesses) members of parents and offspring together survive. Instead of ranking all of them,
+    only the offspring entering the population, and the parents they replace, are found, so that the population can be
+    compacted in place:
+        population[replaced] = offspring[entering]
+        fitnesses[replaced] = offspring_fitnesses[entering]
+
+    Methods:
+        "partition" :: numpy.argpartition over parents and offspring together, O(n + k) for 'n' parents and 'k'
+                       offspring, suited to generational algorithms (k close to n)
+        "heap" :: the k worst parents are found with a bounded heap (heapq), O(n log k), and only they compete with the
+                  offspring, suited to few offspring (k much smaller than n), see also SurvivorHeap, which keeps the
+                  heap from generation to generation
+    Ties between a parent and a child are resolved in favour of the parent by "heap", and arbitrarily by "partition".
+
+    :param parent_fitnesses: (numpy.ndarray) containing fitness of each population member
+    :param offspring_fitnesses: (numpy.ndarray) containing fitness of each child
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param method: (string) pass: "partition" or "heap" (refer the comments above)
+    :return: (tuple) containing (numpy.ndarray of int) indices of the replaced population members, and
+             (numpy.ndarray of int) indices of the children replacing them, in the same order
+    """
+    if mode not in ("min", "max"):
+        raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+    parent_fitnesses = np.asarray(parent_fitnesses, dtype=np.float64)
+    offspring_fitnesses = np.asarray(offspring_fitnesses, dtype=np.float64)
+    n, k = len(parent_fitnesses), len(offspring_fitnesses)
+    # work with costs, the lower the better
+    sign = 1.0 if mode == "min" else -1.0
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    if method == "partition":
+        costs = np.concatenate((parent_fitnesses, offspring_fitnesses)) * sign
+        # the k worst members of parents and offspring together are dropped
+        dropped = np.argpartition(costs, n - 1)[n:]
+        replaced = np.sort(dropped[dropped < n])
+        entering = np.setdiff1d(np.arange(k), dropped[dropped >= n] - n, assume_unique=True)
+        return replaced, entering
+
+    if method == "heap":
+        costs = (parent_fitnesses * sign).tolist()
+        # the k worst parents, the worst first
+        worst = heapq.nlargest(min(k, n), range(n), key=costs.__getitem__)
+        # best children, the best first
+        best = np.argsort(offspring_fitnesses * sign, kind="stable")[:len(worst)]
+        # the i'th best child replaces the i'th worst parent as long as it is better, as both are sorted, the first
+        # child which is not better ends the replacements
+        better = offspring_fitnesses[best] * sign < np.asarray([costs[i] for i in worst])
+        m = len(better) if better.all() else int(np.argmin(better))
+        return np.asarray(worst[:m], dtype=np.int64), best[:m]
+
+    raise ValueError("Incorrect method selected, please pass 'partition' or 'heap' as method")
+
+
+class SurvivorHeap:
+    """
+    Incremental elitist survivor selection, for steady-state algorithms
+
+    The population members are kept in a binary heap ordered by fitness, the worst member on top, which is built once,
+    in O(n). Every merge of 'k' children then costs O(k log n) instead of a pass over the population, as only the top
+    of the heap is compared with the children. The heap assumes that the replacements returned by merge() are applied
+    to the population (see survivor_selection()), and that fitness of the population does not change otherwise.
+
+    :param fitnesses: (numpy.ndarray) containing fitness of each population member
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    """
+
+    def __init__(self, fitnesses, mode):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        # costs, the lower the better, are negated so that the worst member is on top of heapq's min-heap
+        self.sign = 1.0 if mode == "min" else -1.0
+        costs = (np.asarray(fitnesses, dtype=np.float64) * self.sign).tolist()
+        self.heap = [(-cost, i) for i, cost in enumerate(costs)]
+        heapq.heapify(self.heap)
+
+    def merge(self, offspring_fitnesses):
+        """
+        Method to merge the children into the population, each child replaces the worst member if it is better
+
+        :param offspring_fitnesses: (numpy.ndarray) containing fitness of each child
+        :return: (tuple) containing (numpy.ndarray of int) indices of the replaced population members, and
+                 (numpy.ndarray of int) indices of the children replacing them, in the same order
+        """
+        costs = np.asarray(offspring_fitnesses, dtype=np.float64) * self.sign
+        replaced = []
+        entering = []
+        # best children first, so that a child never replaces a better child of the same merge
+        for j in np.argsort(costs, kind="stable").tolist():
+            worst_cost, i = self.heap[0]
+            if not costs[j] < -worst_cost:
+                break
+            heapq.heapreplace(self.heap, (-costs[j], i))
+            replaced.append(i)
+            entering.append(j)
+        return np.asarray(replaced, dtype=np.int64), np.asarray(entering, dtype=np.int64)
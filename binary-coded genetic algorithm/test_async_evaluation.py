@@ -0,0 +1,99 @@
+# Tests of AsyncEvaluator of evaluation.py, against a local stub server
+
+# NOTE: evaluation.py is the same in every package of this repository, so it is tested here only.
+
+# import necessary libraries
+import asyncio
+
+import numpy as np
+
+from evaluation import AsyncEvaluator
+
+
+async def sphere(chromosome):
+    await asyncio.sleep(0.001)
+    return float(np.sum(np.asarray(chromosome) ** 2))
+
+
+def test_fitness_of_every_member_in_order():
+    population = np.random.default_rng(0).uniform(-5, 5, (50, 3))
+    fitnesses = AsyncEvaluator(sphere)(population)
+    assert np.array_equal(fitnesses, np.sum(population ** 2, axis=1))
+
+
+def test_concurrency_is_capped():
+    in_flight = 0
+    peak = 0
+
+    async def fitness(chromosome):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return 0.0
+
+    AsyncEvaluator(fitness, max_concurrency=3)(np.zeros((20, 2)))
+    assert peak == 3
+
+
+def test_timeout_gives_worst_fitness():
+    async def fitness(chromosome):
+        await asyncio.sleep(10 if chromosome[0] < 0 else 0)
+        return 1.0
+
+    population = np.array([[1.0], [-1.0], [2.0], [-2.0]])
+    evaluator = AsyncEvaluator(fitness, mode="min", timeout=0.05)
+    fitnesses = evaluator(population)
+    assert np.array_equal(fitnesses, [1.0, np.inf, 1.0, np.inf])
+    assert evaluator.n_timeouts == 2
+    assert evaluator.n_failures == 2
+
+
+def test_failure_gives_worst_fitness():
+    async def fitness(chromosome):
+        if chromosome[0] < 0:
+            raise RuntimeError("simulator crashed")
+        return 1.0
+
+    population = np.array([[1.0], [-1.0]])
+    evaluator = AsyncEvaluator(fitness, mode="max")
+    assert np.array_equal(evaluator(population), [1.0, -np.inf])
+    assert evaluator.n_failures == 1
+    assert evaluator.n_timeouts == 0
+
+
+def test_stub_server():
+    # stub simulator: replies with the sum of squares of the values of a request line, a negative first value hangs
+    async def handle(reader, writer):
+        values = np.array(list(map(float, (await reader.readline()).split())))
+        if values[0] < 0:
+            await asyncio.sleep(10)
+        writer.write("{!r}\n".format(float(np.sum(values ** 2))).encode())
+        await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        async def fitness(chromosome):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write((" ".join(map(repr, map(float, chromosome))) + "\n").encode())
+            await writer.drain()
+            line = await reader.readline()
+            writer.close()
+            return float(line)
+
+        population = np.random.default_rng(1).uniform(0, 1, (30, 4))
+        population[::10, 0] = -1
+        evaluator = AsyncEvaluator(fitness, max_concurrency=8, timeout=0.5)
+        fitnesses = await evaluator.evaluate(population)
+        server.close()
+        return population, fitnesses, evaluator
+
+    population, fitnesses, evaluator = asyncio.run(main())
+    hung = population[:, 0] < 0
+    assert np.array_equal(fitnesses[~hung], np.sum(population[~hung] ** 2, axis=1))
+    assert np.all(fitnesses[hung] == np.inf)
+    assert evaluator.n_timeouts == 3
@@ -0,0 +1,49 @@
+# Tests of batch crossover over the packed mating pool of crossover.py
+
+# import necessary libraries
+import numpy as np
+import pytest
+
+from crossover import kp_crossover_batch, uniform_crossover_batch
+
+
+def switches(genes, n_bits):
+    # number of neighbouring bits which differ, among the lowest n_bits bits of every gene
+    bits = (genes[..., None].astype(np.uint64) >> np.arange(n_bits, dtype=np.uint64)) & np.uint64(1)
+    return np.count_nonzero(np.diff(bits, axis=-1), axis=-1)
+
+
+@pytest.mark.parametrize("k", [1, 2, 5])
+@pytest.mark.parametrize("dtype, n_bits", [(np.uint64, None), (np.uint16, None), (np.uint16, 10)])
+def test_k_point_switch_count(k, dtype, n_bits):
+    zeros = np.zeros((200, 3), dtype=dtype)
+    ones = np.full((200, 3), np.iinfo(dtype).max if n_bits is None else 2 ** n_bits - 1, dtype=dtype)
+    child1, child2 = kp_crossover_batch(zeros, ones, k, rng=np.random.default_rng(k), n_bits=n_bits)
+    assert child1.dtype == dtype and child2.dtype == dtype
+    n_bits = n_bits or np.dtype(dtype).itemsize * 8
+    # every crossover point switches the parent the bits are taken from, once
+    assert np.all(switches(child1, n_bits) == k)
+    assert np.all(child1 ^ child2 == ones)
+    # the first (leftmost) bit is always taken from the first parent
+    assert np.all(child1 >> dtype(n_bits - 1) == 0)
+
+
+def test_children_keep_the_bits_of_the_parents():
+    rng = np.random.default_rng(0)
+    parents1 = rng.integers(0, 2 ** 63, (50, 4), dtype=np.uint64)
+    parents2 = rng.integers(0, 2 ** 63, (50, 4), dtype=np.uint64)
+    for child1, child2 in (kp_crossover_batch(parents1, parents2, 3, rng=rng),
+                           uniform_crossover_batch(parents1, parents2, rng=rng)):
+        # every bit of a child comes from one parent, and the other child gets the bit of the other parent
+        assert np.array_equal(child1 ^ child2, parents1 ^ parents2)
+        assert np.array_equal(child1 & child2, parents1 & parents2)
+
+
+def test_uniform_mask_is_shared_by_the_genes_of_a_pair():
+    zeros = np.zeros((100, 5), dtype=np.uint64)
+    ones = np.full((100, 5), np.iinfo(np.uint64).max, dtype=np.uint64)
+    child1, _ = uniform_crossover_batch(zeros, ones, rng=np.random.default_rng(1))
+    assert np.all(child1 == child1[:, :1])
+    # each bit is swapped with probability 0.5
+    fraction = np.unpackbits(child1[:, 0].copy().view(np.uint8)).mean()
+    assert 0.45 < fraction < 0.55
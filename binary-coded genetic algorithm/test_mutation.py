@@ -0,0 +1,46 @@
+# Tests of mutation of packed chromosomes and populations of mutation.py
+
+# import necessary libraries
+import numpy as np
+import pytest
+
+from mutation import bit_flip_mutation, br_mutation, geometric_positions
+from random_numbers import set_seed
+
+
+def test_geometric_positions():
+    positions = geometric_positions(100000, 0.01, rng=np.random.default_rng(0))
+    assert np.all(np.diff(positions) > 0)
+    assert positions[0] >= 0 and positions[-1] < 100000
+    assert 900 < len(positions) < 1100
+    assert len(geometric_positions(10, 0, rng=np.random.default_rng(0))) == 0
+    assert np.array_equal(geometric_positions(10, 1, rng=np.random.default_rng(0)), np.arange(10))
+
+
+@pytest.mark.parametrize("mp", [0.001, 0.02, 0.3])
+def test_bit_flip_rate(mp):
+    population = np.zeros((500, 10), dtype=np.uint64)
+    bit_flip_mutation(population, mp, rng=np.random.default_rng(1))
+    # every bit of the zero population is flipped at most once, so the set bits are the flipped ones
+    rate = np.unpackbits(population.view(np.uint8)).mean()
+    n = population.size * 64
+    assert abs(rate - mp) < 5 * np.sqrt(mp * (1 - mp) / n)
+
+
+def test_bit_flip_within_bits_per_gene():
+    population = np.zeros((300, 4), dtype=np.uint16)
+    bit_flip_mutation(population, 0.5, rng=np.random.default_rng(2), n_bits=10)
+    assert population.any()
+    assert np.all(population < 2 ** 10)
+
+
+@pytest.mark.parametrize("dtype", [np.uint64, np.uint16])
+def test_br_mutation_of_packed_chromosome(dtype):
+    set_seed(3)
+    chromosome = np.zeros(5, dtype=dtype)
+    mutated = br_mutation(chromosome)
+    assert mutated is chromosome and chromosome.dtype == dtype
+    # the same bits are flipped in every gene
+    assert chromosome.any() and np.all(chromosome == chromosome[0])
+    with pytest.raises(TypeError):
+        br_mutation(np.zeros(5, dtype=np.int64))
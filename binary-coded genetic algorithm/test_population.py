@@ -0,0 +1,31 @@
+# Tests of packed population storage of population.py, and of the conversions of number_system_converter.py
+
+# import necessary libraries
+import numpy as np
+from bitarray import bitarray
+
+from number_system_converter import bin_to_float, decode_population, float_to_bin
+from population import pack_population, unpack_population
+
+
+def test_round_trip():
+    values = np.random.default_rng(0).uniform(-5, 5, (6, 3))
+    population = [[float_to_bin(v) for v in member] for member in values]
+    packed = pack_population(population)
+    assert packed.dtype == np.uint64 and packed.shape == (6, 3)
+    assert np.array_equal(decode_population(packed), values)
+    assert unpack_population(packed) == population
+
+
+def test_little_endian_gene_round_trip():
+    gene = bitarray(float_to_bin(1.5), endian="little")
+    packed = pack_population([[gene]])
+    assert decode_population(packed)[0, 0] == 1.5
+    # unpacked genes are big endian, with the same bits
+    assert unpack_population(packed)[0][0].to01() == gene.to01()
+
+
+def test_bin_to_float_of_little_endian_gene():
+    gene = float_to_bin(-3.25e-7)
+    assert bin_to_float(gene) == -3.25e-7
+    assert bin_to_float(bitarray(gene, endian="little")) == -3.25e-7
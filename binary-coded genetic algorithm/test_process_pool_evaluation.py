@@ -0,0 +1,48 @@
+# Tests of ProcessPoolEvaluator of evaluation.py
+
+# NOTE: evaluation.py is the same in every package of this repository, so it is tested here only.
+
+# import necessary libraries
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from evaluation import ProcessPoolEvaluator, SerialEvaluator
+
+
+def sphere(chromosome):
+    return float(np.sum(np.asarray(chromosome) ** 2))
+
+
+def sphere_batch(population):
+    return np.sum(np.asarray(population) ** 2, axis=1)
+
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+@pytest.mark.parametrize("fitness_batch", [None, sphere_batch])
+def test_same_results_as_serial_evaluation(method, fitness_batch):
+    if method not in multiprocessing.get_all_start_methods():
+        pytest.skip("start method {} is not available".format(method))
+    rng = np.random.default_rng(0)
+    with ProcessPoolEvaluator(sphere, fitness_batch, max_workers=2,
+                              mp_context=multiprocessing.get_context(method)) as evaluator:
+        # the first call sizes the chunks of the second one, and the pool is reused
+        for n in (101, 37):
+            population = rng.uniform(-5, 5, (n, 3))
+            assert np.array_equal(evaluator(population), SerialEvaluator(sphere)(population))
+        assert evaluator.time_per_member is not None
+        assert len(evaluator(np.empty((0, 3)))) == 0
+    assert evaluator.executor is None
+
+
+def test_chunk_size():
+    evaluator = ProcessPoolEvaluator(sphere, max_workers=4, chunks_per_worker=4, min_chunk_time=0.05)
+    # before any measurement, 4 chunks for every worker
+    assert evaluator.chunk_size(160) == 10
+    # a chunk takes at least min_chunk_time, but never more than an equal share of a worker
+    evaluator.time_per_member = 0.001
+    assert evaluator.chunk_size(160) == 40
+    evaluator.time_per_member = 0.01
+    assert evaluator.chunk_size(160) == 10
+    assert evaluator.chunk_size(1) == 1
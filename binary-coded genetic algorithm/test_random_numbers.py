@@ -0,0 +1,35 @@
+# Tests of random_numbers.py
+
+# NOTE: random_numbers.py is the same in every package of this repository, so it is tested here only.
+
+# import necessary libraries
+import numpy as np
+import pytest
+
+from random_numbers import distinct_indices
+
+
+def test_distinct_indices_are_distinct_and_within_range():
+    r = distinct_indices(3, 10, 7, size=(200,), rng=np.random.default_rng(0))
+    assert r.shape == (200, 7)
+    assert np.all((r >= 3) & (r < 10))
+    # all the 7 numbers are needed, so every set is a permutation
+    assert np.all(np.sort(r, axis=1) == np.arange(3, 10))
+
+
+def test_distinct_indices_exclude():
+    n = 6
+    r = distinct_indices(0, n, 5, size=n, exclude=np.arange(n), rng=np.random.default_rng(1))
+    for i in range(n):
+        assert sorted(r[i]) == [j for j in range(n) if j != i]
+    with pytest.raises(ValueError):
+        distinct_indices(0, n, 6, size=n, exclude=np.arange(n))
+
+
+def test_distinct_indices_are_uniform():
+    r = distinct_indices(0, 5, 2, size=50000, exclude=2, rng=np.random.default_rng(2))
+    assert not np.any(r == 2)
+    # every ordered pair of distinct numbers other than 2 is equally likely
+    pairs = np.unique(r[:, 0] * 5 + r[:, 1], return_counts=True)[1]
+    assert len(pairs) == 12
+    assert np.all(np.abs(pairs / 50000 - 1 / 12) < 0.01)
@@ -0,0 +1,112 @@
+# Tests of RemoteEvaluator and run_worker() of remote_evaluation.py, with worker processes on localhost
+
+# NOTE: remote_evaluation.py is the same in every package of this repository, so it is tested here only.
+
+# import necessary libraries
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+import numpy as np
+
+from evaluation import SerialEvaluator
+from remote_evaluation import RemoteEvaluator, run_worker
+
+# workers are started fresh, without the threads of the coordinator
+context = multiprocessing.get_context("spawn")
+
+
+def slow_sphere(chromosome):
+    time.sleep(0.002)
+    return float(np.sum(np.asarray(chromosome) ** 2))
+
+
+def crashing_sphere(chromosome):
+    if chromosome[0] < 0:
+        raise RuntimeError("fitness failed")
+    return float(np.sum(np.asarray(chromosome) ** 2))
+
+
+def start_workers(port, fitness, n):
+    workers = [context.Process(target=run_worker, args=("127.0.0.1", port, fitness), kwargs={"heartbeat_interval": 0.1})
+               for _ in range(n)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def wait_for_workers(evaluator, n):
+    deadline = time.time() + 30
+    while evaluator.n_workers < n and time.time() < deadline:
+        time.sleep(0.01)
+    assert evaluator.n_workers == n
+
+
+def stop_workers(workers):
+    for worker in workers:
+        worker.join(10)
+        if worker.is_alive():
+            worker.kill()
+
+
+def test_same_results_as_serial_evaluation():
+    population = np.random.default_rng(0).uniform(-5, 5, (200, 4))
+    with RemoteEvaluator("127.0.0.1", max_batch_size=16, timeout=60) as evaluator:
+        workers = start_workers(evaluator.address[1], slow_sphere, 2)
+        wait_for_workers(evaluator, 2)
+        fitnesses = evaluator(population)
+    stop_workers(workers)
+    assert np.array_equal(fitnesses, SerialEvaluator(slow_sphere)(population))
+    assert [worker.exitcode for worker in workers] == [0, 0]
+
+
+def test_batch_of_killed_worker_is_dispatched_again():
+    population = np.random.default_rng(1).uniform(-5, 5, (600, 4))
+    with RemoteEvaluator("127.0.0.1", max_batch_size=20, heartbeat_timeout=1.0, timeout=60) as evaluator:
+        workers = start_workers(evaluator.address[1], slow_sphere, 2)
+        wait_for_workers(evaluator, 2)
+        # warm up, so that the batches are sized by the measured time, and both workers are busy when one is killed
+        evaluator(population[:40])
+        killer = threading.Timer(0.3, os.kill, (workers[0].pid, signal.SIGKILL))
+        killer.start()
+        fitnesses = evaluator(population)
+        killer.join()
+        assert evaluator.n_redispatched >= 1
+        assert evaluator.n_workers == 1
+    stop_workers(workers)
+    assert np.array_equal(fitnesses, SerialEvaluator(slow_sphere)(population))
+
+
+def test_workers_which_died_while_idle_do_not_fail_batches():
+    population = np.random.default_rng(3).uniform(-5, 5, (90, 4))
+    # any failed attempt would give the batch up
+    with RemoteEvaluator("127.0.0.1", max_batch_size=10, timeout=60, max_attempts=1) as evaluator:
+        workers = start_workers(evaluator.address[1], slow_sphere, 3)
+        wait_for_workers(evaluator, 3)
+        for worker in workers[:2]:
+            os.kill(worker.pid, signal.SIGKILL)
+            worker.join(10)
+        fitnesses = evaluator(population)
+        assert evaluator.n_failed_batches == 0
+        assert evaluator.n_workers == 1
+    stop_workers(workers)
+    assert np.array_equal(fitnesses, SerialEvaluator(slow_sphere)(population))
+
+
+def test_failing_fitness_gives_worst_fitness():
+    population = np.random.default_rng(2).uniform(0, 1, (40, 3))
+    population[5, 0] = -1
+    with RemoteEvaluator("127.0.0.1", max_batch_size=10, timeout=60, mode="min", max_attempts=2) as evaluator:
+        workers = start_workers(evaluator.address[1], crashing_sphere, 2)
+        wait_for_workers(evaluator, 2)
+        fitnesses = evaluator(population)
+        # workers survive failures of the fitness function
+        assert evaluator.n_workers == 2
+        assert evaluator.n_failed_batches == 1
+    stop_workers(workers)
+    failed = np.zeros(len(population), dtype=bool)
+    failed[:10] = True
+    assert np.all(fitnesses[failed] == np.inf)
+    assert np.array_equal(fitnesses[~failed], np.sum(population[~failed] ** 2, axis=1))
@@ -0,0 +1,123 @@
+# Tests of selection over precomputed fitness of selection.py
+
+# NOTE: selection.py of the real-coded genetic algorithm has the same selection functions, they are tested here only.
+
+# import necessary libraries
+import numpy as np
+
+import pytest
+
+from selection import (SurvivorHeap, batch_tournament_selection, fitness_proportional_selection, rank_based_selection,
+                       ranking_probabilities, stochastic_universal_sampling, survivor_selection)
+
+
+def test_tournament_selection_without_replacement():
+    rng = np.random.default_rng(0)
+    fitnesses = rng.random(50)
+    selected = batch_tournament_selection(fitnesses, 1.0, 3, "min", rng=rng)
+    # all the members are selected once when cp = 1, as winners are banned from further tournaments
+    assert sorted(selected) == list(range(50))
+    selected = batch_tournament_selection(fitnesses, 0.5, 3, "min", rng=rng)
+    assert len(selected) == 26 and len(set(selected)) == 26
+
+
+def test_tournament_selection_pressure():
+    fitnesses = np.arange(100, dtype=np.float64)
+    rng = np.random.default_rng(1)
+    mean = np.mean([fitnesses[batch_tournament_selection(fitnesses, 0.2, 5, "max", rng=rng)].mean()
+                    for _ in range(50)])
+    # the winners of tournaments among 5 members are much fitter than the average member
+    assert mean > 75
+
+
+@pytest.mark.parametrize("mode", ["min", "max"])
+def test_fitness_proportional_selection_of_all_members(mode):
+    # the worst member has zero weight, so the last selections are made once no positive weight is left
+    rng = np.random.default_rng(2)
+    for _ in range(500):
+        fitnesses = rng.random(2 * rng.integers(1, 20))
+        selected = fitness_proportional_selection(fitnesses, 1.0, mode, rng=rng)
+        assert sorted(selected) == list(range(len(fitnesses)))
+
+
+def test_fitness_proportional_selection_of_zero_fitness():
+    selected = fitness_proportional_selection([0.1, 0.2, 0.7, 0.0], 1.0, "max", scaling="none",
+                                              rng=np.random.default_rng(3))
+    assert sorted(selected) == [0, 1, 2, 3]
+
+
+def test_fitness_proportional_selection_with_replacement():
+    fitnesses = np.array([1.0, 2.0, 3.0, 4.0])
+    selected = fitness_proportional_selection(np.tile(fitnesses, 25000), 1.0, "max", replace=True, scaling="none",
+                                              rng=np.random.default_rng(4))
+    shares = np.bincount(selected % 4, minlength=4) / len(selected)
+    assert np.allclose(shares, fitnesses / fitnesses.sum(), atol=0.01)
+
+
+def test_stochastic_universal_sampling_is_within_one_of_expected():
+    fitnesses = np.random.default_rng(5).random(40)
+    weights = fitnesses - fitnesses.min()
+    expected = weights / weights.sum() * 40
+    for seed in range(20):
+        selected = stochastic_universal_sampling(fitnesses, 1.0, "max", rng=np.random.default_rng(seed))
+        counts = np.bincount(selected, minlength=40)
+        assert len(selected) == 40
+        assert np.all(np.abs(counts - expected) < 1)
+
+
+def test_ranking_probabilities():
+    fitnesses = np.array([3.0, 1.0, 4.0, 1.5, 9.0])
+    linear = ranking_probabilities(fitnesses, "min", "linear", pressure=2)
+    assert np.isclose(linear.sum(), 1)
+    # the worst member is never selected with pressure 2, and the best one is expected to be selected twice
+    assert linear[4] == 0 and np.isclose(linear[1] * 5, 2)
+    exponential = ranking_probabilities(fitnesses, "max", "exponential", base=0.5)
+    assert np.isclose(exponential.sum(), 1)
+    assert np.allclose(exponential[[4, 2, 0, 3, 1]][1:] / exponential[[4, 2, 0, 3, 1]][:-1], 0.5)
+
+
+def test_rank_based_selection_depends_on_order_only():
+    selected = rank_based_selection([1.0, 2.0, 3.0, 1000.0], 1.0, "max", rng=np.random.default_rng(6))
+    same = rank_based_selection([1.0, 2.0, 3.0, 4.0], 1.0, "max", rng=np.random.default_rng(6))
+    assert np.array_equal(selected, same)
+
+
+def test_rank_based_selection_follows_ranking_probabilities():
+    fitnesses = np.array([5.0, 1.0, 4.0, 2.0, 3.0])
+    counts = np.zeros(5)
+    rng = np.random.default_rng(7)
+    for _ in range(20000):
+        counts += np.bincount(rank_based_selection(fitnesses, 1.0, "min", pressure=1.5, rng=rng), minlength=5)
+    assert np.allclose(counts / counts.sum(), ranking_probabilities(fitnesses, "min", "linear", pressure=1.5),
+                       atol=0.01)
+
+
+@pytest.mark.parametrize("method", ["partition", "heap"])
+@pytest.mark.parametrize("mode", ["min", "max"])
+def test_survivor_selection_keeps_the_best(method, mode):
+    rng = np.random.default_rng(8)
+    for k in (1, 5, 30, 45):
+        parents = rng.permutation(100)[:30].astype(np.float64)
+        offspring = rng.permutation(100)[:k] + 0.5
+        replaced, entering = survivor_selection(parents, offspring, mode, method)
+        assert len(replaced) == len(entering) == len(set(replaced))
+        survivors = parents.copy()
+        survivors[replaced] = offspring[entering]
+        # the population is compacted in place into the best 30 of parents and offspring together
+        best = np.sort(np.concatenate((parents, offspring)))
+        best = best[:30] if mode == "min" else best[-30:]
+        assert np.array_equal(np.sort(survivors), np.sort(best))
+
+
+def test_survivor_heap_matches_survivor_selection():
+    rng = np.random.default_rng(9)
+    fitnesses = rng.random(50)
+    heap = SurvivorHeap(fitnesses, "min")
+    for _ in range(200):
+        offspring = rng.random(2)
+        expected = fitnesses.copy()
+        replaced, entering = survivor_selection(expected, offspring, "min", "heap")
+        expected[replaced] = offspring[entering]
+        replaced, entering = heap.merge(offspring)
+        fitnesses[replaced] = offspring[entering]
+        assert np.array_equal(np.sort(fitnesses), np.sort(expected))
@@ -0,0 +1,60 @@
+# Configuration of pytest for the whole repository
+
+# Every algorithm is a directory of flat modules importing each other by their plain names (e.g. "from selection import
+# tournament_selection"), and some of these names (selection, crossover, mutation, fitness, ...) exist in more than one
+# directory with different contents. Before the tests of a directory are imported, and before each of them runs, the
+# modules loaded from the other directories are set aside, the modules of the directory are put back into sys.modules,
+# and the directory goes first on sys.path. So every test sees the modules of its own algorithm (also in the worker
+# processes it starts), when the tests of all the algorithms are run together.
+
+# import necessary libraries
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# modules set aside, by directory
+stashed = {}
+
+
+def module_directory(module):
+    """
+    Function to find the directory of the algorithm a module was loaded from
+
+    :param module: (module) loaded module
+    :return: (string) the directory, or None if the module is not a module of an algorithm of this repository
+    """
+    path = getattr(module, "__file__", None)
+    if not path or os.path.basename(path) == "conftest.py":
+        return None
+    directory = os.path.dirname(os.path.abspath(path))
+    return directory if os.path.dirname(directory) == ROOT else None
+
+
+def activate(directory):
+    """
+    Function to make the modules of a directory the ones imported by their plain names
+
+    :param directory: (string) directory of an algorithm
+    """
+    for name, module in list(sys.modules.items()):
+        owner = module_directory(module)
+        if owner is not None and owner != directory:
+            stashed.setdefault(owner, {})[name] = sys.modules.pop(name)
+    sys.modules.update(stashed.pop(directory, {}))
+    if directory in sys.path:
+        sys.path.remove(directory)
+    sys.path.insert(0, directory)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collectstart(collector):
+    if isinstance(collector, pytest.Module):
+        activate(str(collector.path.parent))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    activate(str(item.path.parent))
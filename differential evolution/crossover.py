@@ -17,11 +17,15 @@
 #   the mutant vector, but the first time that R > Cr , the current and all remaining parameters are taken from the
 #   target vector.
 
+# For a population stored as a (NP, D) numpy array, binomial_crossover_batch() and exponential_crossover_batch() build
+# all the trial vectors at once, from a boolean mask of the parameters taken from the mutant vectors.
+
 # import necessary libraries
 import numpy as np
 import copy
 
 # import necessary modules
+from random_numbers import get_rng
 
 # ======================================================================================================================
 # ===== Helper functions ===============================================================================================
@@ -41,6 +45,9 @@ def binomial_crossover(target_vec, mutant_vec, CR):
     trial vector will not replicate the target vector. Then, comparing CR to random R determines the source for each
     remaining trial parameter. If R ≤ Cr , then the parameter comes from the mutant, otherwise, the target is the source
 
+    NOTE: The randomly chosen parameter is moved to the front of the trial vector, so the remaining parameters are
+          shifted, use binomial_crossover_batch() to keep every parameter in its position.
+
     :param target_vec: (list of list) containing all target vectors
     :param mutant_vec: (list of list) containing all mutant vectors
     :param CR: (float) Crossover rate, should be between (0, 1)
@@ -52,15 +59,17 @@ def binomial_crossover(target_vec, mutant_vec, CR):
 
     trial_vec = []
 
+    rng = get_rng()
     for i in range(len(tv)):
         # randomly choose one paramenter from the mutant so that the trial vector will not replicate the target vector.
         trial_vec_i = []
-        r = np.random.randint(0, len(tv[i]))
+        r = rng.integers(0, len(tv[i]))
         trial_vec_i.append(mv[i].pop(r))
         del tv[i][r]
-        # now select other parameters for trial vector
+        # now select other parameters for trial vector, drawing random numbers for all of them in one go
+        rs = rng.random(len(tv[i]))
         for j in range(len(tv[i])):
-            r = np.random.uniform(0, 1)
+            r = rs[j]
             if r <= CR:
                 trial_vec_i.append(mv[i][j])
             elif r > CR:
@@ -80,6 +89,9 @@ def exponential_crossover(target_vec, mutant_vec, CR):
     generated anew for each parameter. As long as R ≤ CR , parameters continue to be taken from the mutant vector, but
     the first time that R > Cr , the current and all remaining parameters are taken from the target vector.
 
+    NOTE: The randomly chosen parameter is moved to the front of the trial vector, so the remaining parameters are
+          shifted, use exponential_crossover_batch() to keep every parameter in its position.
+
     :param target_vec: (list of list) containing all target vectors
     :param mutant_vec: (list of list) containing all mutant vectors
     :param CR: (float) Crossover rate, should be between (0, 1)
@@ -90,19 +102,20 @@ def exponential_crossover(target_vec, mutant_vec, CR):
 
     trial_vec = []
 
+    rng = get_rng()
     for i in range(len(tv)):
         # randomly choose one paramenter from the mutant so that the trial vector will not replicate the target vector.
         trial_vec_i = []
-        print(len(tv[i]))
-        r = np.random.randint(0, len(tv[i]))
-        # print(r, len(tv), len(tv[i]), mv[i][r])
+        r = rng.integers(0, len(tv[i]))
         trial_vec_i.append(mv[i].pop(r))
         del tv[i][r]
         # now select other parameters for trial vector
         j = 0
         # As long as R ≤ CR, parameters continue to be taken from the mutant vector, but the first time that R > Cr ,
-        # the current and all remaining parameters are taken from the target vector.
-        while (np.random.uniform(0, 1) <= CR) and (j < len(mv[i])):
+        # the current and all remaining parameters are taken from the target vector. Random numbers for all the
+        # parameters are drawn in one go.
+        rs = rng.random(len(mv[i]))
+        while (j < len(mv[i])) and (rs[j] <= CR):
             trial_vec_i.append(mv[i][j])
             j = j+1
         while j < len(tv[i]):
@@ -110,3 +123,79 @@ def exponential_crossover(target_vec, mutant_vec, CR):
             j = j+1
         trial_vec.append(trial_vec_i)
     return trial_vec
+
+
+def binomial_crossover_batch(targets, mutants, CR, rng=None, out=None):
+    """
+    This function is a vectorized implementation of binomial crossover of Differential Evolution, over all the target
+    and mutant vectors at once
+
+    Parameter j of trial vector i comes from the mutant vector if R_(i,j) ≤ CR or j = j_rand(i), and from the target
+    vector otherwise, where j_rand(i) is a random column drawn for every row, so that no trial vector replicates its
+    target vector. Every parameter stays in its position.
+
+    :param targets: (numpy.ndarray of float64) of shape (NP, D) containing target vectors
+    :param mutants: (numpy.ndarray of float64) of shape (NP, D) containing mutant vectors
+    :param CR: (float or numpy.ndarray) Crossover rate, should be between (0, 1), either a single value or one value per
+               target vector
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :param out: (numpy.ndarray of float64) of shape (NP, D) to store the trial vectors in, e.g. a buffer reused every
+                generation, a new array is allocated if not passed
+    :return: (numpy.ndarray of float64) of shape (NP, D) containing trial vectors
+    """
+    rng = get_rng(rng)
+    targets = np.asarray(targets, dtype=np.float64)
+    n, d = targets.shape
+    CR = np.asarray(CR, dtype=np.float64).reshape(-1, 1)
+
+    mask = rng.random((n, d)) <= CR
+    mask[np.arange(n), rng.integers(0, d, n)] = True
+
+    if out is None:
+        out = np.empty_like(targets)
+    np.copyto(out, targets)
+    np.copyto(out, mutants, where=mask)
+    return out
+
+
+def exponential_crossover_batch(targets, mutants, CR, rng=None, out=None):
+    """
+    This function is a vectorized implementation of exponential crossover of Differential Evolution, over all the target
+    and mutant vectors at once
+
+    Trial vector i takes a contiguous run of L(i) parameters from the mutant vector, starting at a random column
+    j_rand(i) and wrapping around the end of the vector, and the rest from the target vector. The run continues as long
+    as R ≤ CR, so L(i) - 1 is the number of successes before the first failure of trials with probability CR, which is
+    drawn directly from the geometric distribution: L = 1 + floor(log(U) / log(CR)), capped at D, for uniform U in
+    (0, 1]. The mask of every row is then (j - j_rand(i)) mod D < L(i).
+
+    :param targets: (numpy.ndarray of float64) of shape (NP, D) containing target vectors
+    :param mutants: (numpy.ndarray of float64) of shape (NP, D) containing mutant vectors
+    :param CR: (float or numpy.ndarray) Crossover rate, should be between (0, 1), either a single value or one value per
+               target vector
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :param out: (numpy.ndarray of float64) of shape (NP, D) to store the trial vectors in, e.g. a buffer reused every
+                generation, a new array is allocated if not passed
+    :return: (numpy.ndarray of float64) of shape (NP, D) containing trial vectors
+    """
+    rng = get_rng(rng)
+    targets = np.asarray(targets, dtype=np.float64)
+    n, d = targets.shape
+    CR = np.broadcast_to(np.asarray(CR, dtype=np.float64), (n,))
+
+    # length of the run of every row, CR = 1 (division by log(1) = 0) runs over the whole vector
+    u = 1 - rng.random(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        successes = np.floor(np.log(u) / np.log(CR))
+    length = 1 + np.minimum(np.nan_to_num(successes, nan=d, posinf=d, neginf=d), d - 1).astype(np.int64)
+
+    start = rng.integers(0, d, n)
+    mask = (np.arange(d)[None, :] - start[:, None]) % d < length[:, None]
+
+    if out is None:
+        out = np.empty_like(targets)
+    np.copyto(out, targets)
+    np.copyto(out, mutants, where=mask)
+    return out
@@ -0,0 +1,285 @@
+# Evaluation of fitness of a whole population
+
+# There are two ways to define fitness (see fitness.py):
+#   [1] fitness(chromosome) :: calculates fitness of a single chromosome, called once for every population member
+#   [2] fitness_batch(population) :: calculates fitness of the whole population in one call, e.g. as a vectorized numpy
+#       expression over the (population size, number of genes) matrix
+# Wherever a population is evaluated, evaluate_population() is used, which prefers the batch function when it is
+# defined, and falls back to calling the per chromosome function otherwise.
+
+# Evaluators: an evaluator is a callable object, taking a population and returning the (numpy.ndarray of float64) array
+# of fitness of every member, in order. The algorithms evaluate populations only through an evaluator, and selection
+# works on the fitness arrays they return (see the *_from_fitness() functions of selection.py), so the way fitness is
+# computed can be changed without touching fitness.py:
+#   SerialEvaluator :: evaluates the population in the main process, with evaluate_population()
+#   ProcessPoolEvaluator :: dispatches chunks of the population to a pool of worker processes, for CPU bound fitness
+#                           functions
+#   AsyncEvaluator :: runs an 'async def fitness(chromosome)' for the whole population concurrently, for I/O bound
+#                     fitness functions (e.g. calling a simulator over a socket, or in a subprocess)
+#   RemoteEvaluator :: ships batches of the population to worker processes on other machines, over TCP (see
+#                      remote_evaluation.py)
+
+# import necessary libraries
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# ======================================================================================================================
+# ===== Helper functions ===============================================================================================
+# ======================================================================================================================
+
+
+def as_matrix(population):
+    """
+    Function to convert a population into the matrix passed to the batch fitness function
+
+    Numpy arrays are passed as they are, lists of real valued chromosomes are converted to a (population size,
+    number of genes) array of float64, and lists of bitarray chromosomes are passed as they are, as they have no matrix
+    form.
+
+    :param population: (numpy.ndarray, list of list of float, or list of list of bitarray) containing all chromosomes
+    :return: (numpy.ndarray or list) population to be passed to the batch fitness function
+    """
+    if isinstance(population, np.ndarray):
+        return population
+    if len(population) and len(population[0]) and hasattr(population[0][0], "to01"):
+        return population
+    return np.asarray(population, dtype=np.float64)
+
+# ======================================================================================================================
+# ===== Evaluation functions ===========================================================================================
+# ======================================================================================================================
+
+
+def evaluate_population(population, fitness, fitness_batch=None):
+    """
+    Function to calculate fitness of every population member
+
+    :param population: (numpy.ndarray or list) containing all chromosomes
+    :param fitness: (function) to calculate fitness of a single chromosome
+    :param fitness_batch: (function) to calculate fitness of the whole population in one call, preferred over 'fitness'
+                          if passed
+    :return: (numpy.ndarray of float64) of shape (population size,) containing fitness of each population member
+    """
+    if fitness_batch is not None:
+        fitnesses = np.asarray(fitness_batch(as_matrix(population)), dtype=np.float64).reshape(-1)
+        if len(fitnesses) != len(population):
+            raise ValueError("Batch fitness function returned {} values for {} population members"
+                             .format(len(fitnesses), len(population)))
+        return fitnesses
+    return np.array([fitness(chromosome) for chromosome in population], dtype=np.float64)
+
+# ======================================================================================================================
+# ===== Evaluators =====================================================================================================
+# ======================================================================================================================
+
+
+class SerialEvaluator:
+    """
+    Evaluator calculating fitness of the population in the main process (see evaluate_population())
+
+    :param fitness: (function) to calculate fitness of a single chromosome
+    :param fitness_batch: (function) to calculate fitness of the whole population in one call, preferred over 'fitness'
+                          if passed
+    """
+
+    def __init__(self, fitness, fitness_batch=None):
+        self.fitness = fitness
+        self.fitness_batch = fitness_batch
+
+    def __call__(self, population):
+        return evaluate_population(population, self.fitness, self.fitness_batch)
+
+
+# fitness functions of a worker process, set once when the worker starts, so that they are not sent with every chunk
+_worker_fitness = None
+_worker_fitness_batch = None
+
+
+def _init_worker(fitness, fitness_batch):
+    """
+    Function to initialize a worker process of ProcessPoolEvaluator
+
+    :param fitness: (function) to calculate fitness of a single chromosome
+    :param fitness_batch: (function) to calculate fitness of the whole chunk in one call, or None
+    """
+    global _worker_fitness, _worker_fitness_batch
+    _worker_fitness = fitness
+    _worker_fitness_batch = fitness_batch
+
+
+def _evaluate_chunk(chunk):
+    """
+    Function to calculate fitness of a chunk of population, in a worker process of ProcessPoolEvaluator
+
+    :param chunk: (numpy.ndarray or list) containing chromosomes of the chunk
+    :return: (numpy.ndarray of float64) containing fitness of each chromosome of the chunk
+    """
+    return evaluate_population(chunk, _worker_fitness, _worker_fitness_batch)
+
+
+class ProcessPoolEvaluator:
+    """
+    Evaluator dispatching fitness calculations to a pool of worker processes (concurrent.futures.ProcessPoolExecutor)
+
+    The population is split into chunks, which are evaluated by the workers, and the results are put together in the
+    order of the population. Chunks are sized adaptively:
+    --[1] There should be at least 'chunks_per_worker' chunks for every worker, so that the workers finish at about the
+          same time even if fitness takes different time for different chromosomes.
+    --[2] A chunk should take at least 'min_chunk_time' seconds to evaluate, so that the cost of sending it to a worker
+          is negligible. The time per chromosome is measured on every call, and used to size the chunks of the next one.
+
+    The pool is started on the first call, and lives until close() is called, use the evaluator as a context manager
+    to shut the workers down cleanly:
+        with ProcessPoolEvaluator(fitness) as evaluator:
+            fitnesses = evaluator(population)
+
+    NOTE: The fitness functions are sent to the workers by pickling, so they should be defined at the top level of a
+          module (e.g. fitness.py), and the main script should be guarded by 'if __name__ == "__main__":'.
+
+    :param fitness: (function) to calculate fitness of a single chromosome
+    :param fitness_batch: (function) to calculate fitness of a whole chunk in one call, preferred over 'fitness' if
+                          passed
+    :param max_workers: (int) number of worker processes, number of CPUs if not passed
+    :param chunks_per_worker: (int) minimum number of chunks for each worker
+    :param min_chunk_time: (float) minimum time in seconds to evaluate a chunk
+    :param mp_context: (multiprocessing context) to start the workers, default context of the platform if not passed
+    """
+
+    def __init__(self, fitness, fitness_batch=None, max_workers=None, chunks_per_worker=4, min_chunk_time=0.05,
+                 mp_context=None):
+        self.fitness = fitness
+        self.fitness_batch = fitness_batch
+        self.max_workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+        self.chunks_per_worker = chunks_per_worker
+        self.min_chunk_time = min_chunk_time
+        self.mp_context = mp_context
+        # measured wall time per chromosome of a single worker, unknown until the first call
+        self.time_per_member = None
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """
+        Method to start the pool of worker processes, if it is not running
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self.mp_context,
+                                                initializer=_init_worker,
+                                                initargs=(self.fitness, self.fitness_batch))
+
+    def close(self):
+        """
+        Method to shut the pool of worker processes down, cancelling chunks which have not started yet
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def chunk_size(self, n):
+        """
+        Method to calculate the number of chromosomes in a chunk, for a population of 'n' chromosomes
+
+        :param n: (int) size of the population
+        :return: (int) number of chromosomes in a chunk
+        """
+        # enough chunks for every worker
+        size = math.ceil(n / (self.max_workers * self.chunks_per_worker))
+        # but not too small to pay off, and never more than an equal share of a worker
+        if self.time_per_member:
+            size = max(size, math.ceil(self.min_chunk_time / self.time_per_member))
+            size = min(size, math.ceil(n / self.max_workers))
+        return max(size, 1)
+
+    def __call__(self, population):
+        n = len(population)
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+        self.start()
+
+        size = self.chunk_size(n)
+        chunks = [population[i:i + size] for i in range(0, n, size)]
+        start = time.perf_counter()
+        # map returns the results in the order of the chunks
+        fitnesses = np.concatenate(list(self.executor.map(_evaluate_chunk, chunks)))
+        elapsed = time.perf_counter() - start
+
+        # every worker was busy for about the elapsed time
+        self.time_per_member = elapsed * min(self.max_workers, len(chunks)) / n
+        return fitnesses
+
+
+class AsyncEvaluator:
+    """
+    Evaluator running a coroutine fitness function ('async def fitness(chromosome)') for the whole population
+    concurrently, on an asyncio event loop
+
+    At most 'max_concurrency' evaluations are in flight at any time, and each one is given at most 'timeout' seconds.
+    An evaluation which times out, or raises an exception, is given the worst possible fitness ('failure_fitness'), so
+    that the member is never selected, instead of failing the whole generation. Failures are counted in 'n_failures'
+    and 'n_timeouts'.
+
+    Calling the evaluator runs its own event loop, and blocks until the whole population is evaluated. From inside a
+    running event loop, await evaluate() instead:
+        fitnesses = evaluator(population)
+        fitnesses = await evaluator.evaluate(population)
+
+    :param fitness: (coroutine function) to calculate fitness of a single chromosome
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem,
+                 used to choose the worst possible fitness
+    :param max_concurrency: (int) maximum number of evaluations in flight at the same time
+    :param timeout: (float) maximum time in seconds of a single evaluation, no limit if not passed
+    :param failure_fitness: (float) fitness of failed evaluations, +inf for "min" and -inf for "max" if not passed
+    """
+
+    def __init__(self, fitness, mode="min", max_concurrency=32, timeout=None, failure_fitness=None):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        if max_concurrency < 1:
+            raise ValueError("Maximum concurrency should be at least 1, got {}".format(max_concurrency))
+        self.fitness = fitness
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        if failure_fitness is None:
+            failure_fitness = np.inf if mode == "min" else -np.inf
+        self.failure_fitness = failure_fitness
+        self.n_failures = 0
+        self.n_timeouts = 0
+
+    def __call__(self, population):
+        return asyncio.run(self.evaluate(population))
+
+    async def evaluate(self, population):
+        """
+        Coroutine to calculate fitness of every member of the population concurrently
+
+        :param population: (numpy.ndarray or list) containing chromosomes of the population
+        :return: (numpy.ndarray of float64) containing fitness of each chromosome, in the order of the population
+        """
+        # the semaphore belongs to the running event loop, so it is created for every call
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        fitnesses = np.empty(len(population), dtype=np.float64)
+
+        async def evaluate_member(i):
+            async with semaphore:
+                try:
+                    fitnesses[i] = await asyncio.wait_for(self.fitness(population[i]), self.timeout)
+                except asyncio.TimeoutError:
+                    self.n_timeouts += 1
+                    self.n_failures += 1
+                    fitnesses[i] = self.failure_fitness
+                except Exception:
+                    self.n_failures += 1
+                    fitnesses[i] = self.failure_fitness
+
+        await asyncio.gather(*(evaluate_member(i) for i in range(len(population))))
+        return fitnesses
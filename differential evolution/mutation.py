@@ -14,11 +14,21 @@
 #   Type4 :: DE/rand/2       V_(i,G) = X_(r1,G) + F*(X_(r2,G) - X_(r3,G) + X_(r4,G) - X_(r5,G))
 #   Type5 :: DE/best/2       V_(i,G) = X_(best,G) + F*(X_(r1,G) - X_(r2,G) + X_(r3,G) - X_(r4,G))
 
+# For a population stored as a (NP, D) numpy array, mutate_population() computes the mutant vectors of all the target
+# vectors at once, with any of the five types, and two more strategies: DE/current-to-pbest/1 and DE/rand-to-best/1.
+
+# NOTE: Mutant vectors are not bounded, if the search domain is, move the offending parameters back into it with
+#       repair() of repair.py, e.g. repair(mutants, search_domain_bounds, "midpoint", parents=targets), or pass the
+#       bounds to mutate_population()
+
 # import necessary libraries
 import numpy as np
 
 # import necessary modules
-from fitness import fitness
+from evaluation import evaluate_population
+from fitness import fitness, fitness_batch
+from random_numbers import distinct_indices, get_rng
+from repair import repair
 
 # ======================================================================================================================
 # ===== Helper functions ===============================================================================================
@@ -29,9 +39,9 @@ def unique_rn_generator(low, high, n, excludee):
     """
     Function to generate a list of unique random integers
 
-    This function uses numpy's random number generator to generate a list of random numbers, checks if all the numbers
-    in the list are unique, if they are unique, the list is returned. If they are not unique, then the list is generated
-    repeatedly until a list with unique numbers is generated.
+    The numbers are drawn without repetition, skipping 'excludee', in the first place (see distinct_indices() of
+    random_numbers.py), instead of regenerating the list until it has no repetitions and does not contain 'excludee',
+    which may take very long when 'n' is close to the population size.
 
     :param low: (int) lowest (inclusive) acceptable random number
     :param high: (int) highest (exclusive) acceptable random number
@@ -39,10 +49,7 @@ def unique_rn_generator(low, high, n, excludee):
     :param excludee: (int) number to be excluded from generated list of random numbers
     :return: (list) containing 'n' unique random numbers
     """
-    r = np.random.randint(low, high, n)
-    while (len(r) != len(set(r))) or (excludee in r):
-        r = np.random.randint(low, high, n)
-    return r
+    return distinct_indices(low, high, n, exclude=excludee)
 
 
 def add_lists(a, b):
@@ -77,6 +84,31 @@ def scalar_mul_list(s, a):
     """
     return [s*i for i in a]
 
+
+def find_best_vector(population, mode, fitnesses=None, evaluator=None):
+    """
+    Function to find the best(fittest) vector of the population
+
+    :param population: (list) of population containing (list) of candidate solution vectors
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fitnesses: (list or numpy.ndarray) containing precomputed fitness of each vector of the population, if not
+                      passed, fitness of each vector is calculated once (in one call, if fitness_batch is defined in
+                      fitness.py)
+    :param evaluator: evaluator of the population (see evaluation.py), e.g. ProcessPoolEvaluator to calculate fitness
+                      in parallel, fitness and fitness_batch of fitness.py are used if not passed
+    :return: (list) the best vector of the population
+    """
+    if fitnesses is None and evaluator is not None:
+        fitnesses = evaluator(population)
+    elif fitnesses is None:
+        fitnesses = evaluate_population(population, fitness, fitness_batch)
+    if mode == "max":
+        return population[int(np.argmax(fitnesses))]
+    elif mode == "min":
+        return population[int(np.argmin(fitnesses))]
+    else:
+        raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+
 # ======================================================================================================================
 # ===== Mutation operators =============================================================================================
 # ======================================================================================================================
@@ -112,7 +144,7 @@ def mutate_vectors_type1(population, F):
     return mutated_vectors
 
 
-def mutate_vectors_type2(population, F, mode):
+def mutate_vectors_type2(population, F, mode, fitnesses=None, evaluator=None):
     """
     This function will implement the type 2 mutation vector (refer the comments above)
 
@@ -126,25 +158,16 @@ def mutate_vectors_type2(population, F, mode):
     :param F: (float) Scaling factor, a real and constant factor between [0, 2] which controls the amplification of the
               differential variation
     :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fitnesses: (list or numpy.ndarray) containing precomputed fitness of each vector of the population, if not
+                      passed, fitness of each vector is calculated once
+    :param evaluator: evaluator of the population (see evaluation.py), used only if 'fitnesses' is not passed,
+                      fitness and fitness_batch of fitness.py are used if not passed
     :return: (list) of mutated population containing (list) of mutated solution vectors
     """
     mutated_vectors = []
 
     # find the best(fittest) vector
-    X_best = population[0]
-    X_best_fitness = fitness(X_best)
-    if mode == "max":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness > X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
-    elif mode == "min":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness < X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
+    X_best = find_best_vector(population, mode, fitnesses, evaluator)
 
     for i in range(len(population)):
         # Select 2 unique random vectors from population, different from current vector
@@ -160,7 +183,7 @@ def mutate_vectors_type2(population, F, mode):
     return mutated_vectors
 
 
-def mutate_vectors_type3(population, F, mode):
+def mutate_vectors_type3(population, F, mode, fitnesses=None, evaluator=None):
     """
     This function will implement the type 3 mutation vector (refer the comments above)
 
@@ -174,25 +197,16 @@ def mutate_vectors_type3(population, F, mode):
     :param F: (float) Scaling factor, a real and constant factor between [0, 2] which controls the amplification of the
               differential variation
     :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fitnesses: (list or numpy.ndarray) containing precomputed fitness of each vector of the population, if not
+                      passed, fitness of each vector is calculated once
+    :param evaluator: evaluator of the population (see evaluation.py), used only if 'fitnesses' is not passed,
+                      fitness and fitness_batch of fitness.py are used if not passed
     :return: (list) of mutated population containing (list) of mutated solution vectors
     """
     mutated_vectors = []
 
     # find the best(fittest) vector
-    X_best = population[0]
-    X_best_fitness = fitness(X_best)
-    if mode == "max":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness > X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
-    elif mode == "min":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness < X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
+    X_best = find_best_vector(population, mode, fitnesses, evaluator)
 
     for i in range(len(population)):
         # Select 2 unique random vectors from population, different from current vector
@@ -242,7 +256,7 @@ def mutate_vectors_type4(population, F):
     return mutated_vectors
 
 
-def mutate_vectors_type5(population, F, mode):
+def mutate_vectors_type5(population, F, mode, fitnesses=None, evaluator=None):
     """
     This function will implement the type 5 mutation vector (refer the comments above)
 
@@ -256,25 +270,16 @@ def mutate_vectors_type5(population, F, mode):
     :param F: (float) Scaling factor, a real and constant factor between [0, 2] which controls the amplification of the
               differential variation
     :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fitnesses: (list or numpy.ndarray) containing precomputed fitness of each vector of the population, if not
+                      passed, fitness of each vector is calculated once
+    :param evaluator: evaluator of the population (see evaluation.py), used only if 'fitnesses' is not passed,
+                      fitness and fitness_batch of fitness.py are used if not passed
     :return: (list) of mutated population containing (list) of mutated solution vectors
     """
     mutated_vectors = []
 
     # find the best(fittest) vector
-    X_best = population[0]
-    X_best_fitness = fitness(X_best)
-    if mode == "max":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness > X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
-    elif mode == "min":
-        for i in population:
-            current_fitness = fitness(i)
-            if current_fitness < X_best_fitness:
-                X_best = i
-                X_best_fitness = current_fitness
+    X_best = find_best_vector(population, mode, fitnesses, evaluator)
 
     for i in range(len(population)):
         # Select 3 unique random vectors from population, different from current vector
@@ -291,3 +296,109 @@ def mutate_vectors_type5(population, F, mode):
         mutated_vectors.append(V_i)
 
     return mutated_vectors
+
+# ======================================================================================================================
+# ===== Population mutation operators ==================================================================================
+# ======================================================================================================================
+
+# strategies of mutate_population(), with the number of random vectors each one needs
+MUTATION_STRATEGIES = {"rand/1": 3, "best/1": 2, "current-to-best/1": 2, "rand/2": 5, "best/2": 4,
+                       "current-to-pbest/1": 2, "rand-to-best/1": 3}
+
+# names of the strategies of mutate_vectors_type1() ... mutate_vectors_type5()
+MUTATION_TYPES = {1: "rand/1", 2: "best/1", 3: "current-to-best/1", 4: "rand/2", 5: "best/2"}
+
+
+def mutate_population(population, F, strategy="rand/1", mode="min", fitnesses=None, p=0.1, search_domain_bounds=None,
+                      repair_strategy="midpoint", rng=None, out=None, evaluator=None):
+    """
+    This function will compute the mutant vectors of the whole population at once, as a (NP, D) matrix
+
+    Random vectors of every target vector are drawn together, as a (NP, number of random vectors) matrix of distinct
+    indices which never contain the index of the target vector (see distinct_indices() of random_numbers.py), and every
+    mutant vector is then computed by array operations over the rows of the population selected by these indices.
+
+    Strategies (types 1 to 5 are named after mutate_vectors_type1() ... mutate_vectors_type5(), see MUTATION_TYPES):
+        "rand/1" :: V_(i,G) = X_(r1,G) + F*(X_(r2,G) - X_(r3,G))
+        "best/1" :: V_(i,G) = X_(best,G) + F*(X_(r1,G) - X_(r2,G))
+        "current-to-best/1" :: V_(i,G) = X_(i,G) + F*(X_(best,G) - X_(i,G)) + F*(X_(r1,G) - X_(r2,G))
+        "rand/2" :: V_(i,G) = X_(r1,G) + F*(X_(r2,G) - X_(r3,G) + X_(r4,G) - X_(r5,G))
+        "best/2" :: V_(i,G) = X_(best,G) + F*(X_(r1,G) - X_(r2,G) + X_(r3,G) - X_(r4,G))
+        "current-to-pbest/1" :: V_(i,G) = X_(i,G) + F*(X_(pbest,G) - X_(i,G)) + F*(X_(r1,G) - X_(r2,G)), where pbest
+                                is drawn for every target vector from the best max(1, p * NP) vectors
+        "rand-to-best/1" :: V_(i,G) = X_(r1,G) + F*(X_(best,G) - X_(r1,G)) + F*(X_(r2,G) - X_(r3,G))
+    NOTE: Types 1, 2, 4 and 5 compute the same formulas as the functions of the same type. mutate_vectors_type3()
+          computes V_(i,G) = X_(i,G) + F*(X_(best,G) - X_(r1,G)) + F*(X_(r1,G) - X_(r2,G)) instead of the
+          "current-to-best/1" formula above, so type 3 of this function differs from it.
+
+    :param population: (numpy.ndarray of float64) of shape (NP, D) containing candidate solution vectors
+    :param F: (float or numpy.ndarray) Scaling factor, a real and constant factor between [0, 2] which controls the
+              amplification of the differential variation, either a single value or one value per target vector
+    :param strategy: (string or int) mutation strategy (refer above), or number of the mutation type (1 to 5)
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fitnesses: (numpy.ndarray) containing precomputed fitness of each vector of the population, needed by the
+                      strategies using the best vectors, if not passed, fitness of each vector is calculated once
+    :param p: (float) fraction of the best vectors from which pbest is drawn, used by "current-to-pbest/1" only
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per parameter, mutant vectors are repaired (see
+                                 repair.py) if passed, and left unbounded otherwise
+    :param repair_strategy: (string) strategy to move offending parameters back into the search domain, the target
+                            vector is the parent of "midpoint" strategy
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :param out: (numpy.ndarray of float64) of shape (NP, D) to store the mutant vectors in, e.g. a buffer reused every
+                generation, a new array is allocated if not passed
+    :param evaluator: evaluator of the population (see evaluation.py), e.g. ProcessPoolEvaluator to calculate fitness
+                      in parallel, used only if 'fitnesses' is needed and not passed, fitness and fitness_batch of
+                      fitness.py are used if not passed
+    :return: (numpy.ndarray of float64) of shape (NP, D) containing mutant vectors
+    """
+    rng = get_rng(rng)
+    strategy = MUTATION_TYPES.get(strategy, strategy)
+    if strategy not in MUTATION_STRATEGIES:
+        raise ValueError("Incorrect strategy selected, please pass one of {}, or a type between 1 and 5 as strategy"
+                         .format(tuple(MUTATION_STRATEGIES)))
+    if mode not in ("min", "max"):
+        raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+
+    population = np.asarray(population, dtype=np.float64)
+    n = len(population)
+    if out is None:
+        out = np.empty_like(population)
+    # scaling factor of every target vector, as a column
+    F = np.asarray(F, dtype=np.float64).reshape(-1, 1)
+
+    # random vectors of every target vector, distinct and different from the target vector
+    r = distinct_indices(0, n, MUTATION_STRATEGIES[strategy], size=n, exclude=np.arange(n), rng=rng)
+    X = [population[r[:, j]] for j in range(r.shape[1])]
+
+    # best vector(s)
+    if "best" in strategy:
+        if fitnesses is None and evaluator is not None:
+            fitnesses = evaluator(population)
+        elif fitnesses is None:
+            fitnesses = evaluate_population(population, fitness, fitness_batch)
+        costs = np.asarray(fitnesses, dtype=np.float64) * (1.0 if mode == "min" else -1.0)
+        if strategy == "current-to-pbest/1":
+            n_best = max(1, int(round(p * n)))
+            top = np.argpartition(costs, n_best - 1)[:n_best]
+            X_best = population[top[rng.integers(0, n_best, n)]]
+        else:
+            X_best = population[int(np.argmin(costs))]
+
+    if strategy == "rand/1":
+        np.add(X[0], F * (X[1] - X[2]), out=out)
+    elif strategy == "best/1":
+        np.add(X_best, F * (X[0] - X[1]), out=out)
+    elif strategy in ("current-to-best/1", "current-to-pbest/1"):
+        np.add(population, F * (X_best - population + X[0] - X[1]), out=out)
+    elif strategy == "rand/2":
+        np.add(X[0], F * (X[1] - X[2] + X[3] - X[4]), out=out)
+    elif strategy == "best/2":
+        np.add(X_best, F * (X[0] - X[1] + X[2] - X[3]), out=out)
+    else:
+        np.add(X[0], F * (X_best - X[0] + X[1] - X[2]), out=out)
+
+    if search_domain_bounds is not None:
+        repair(out, search_domain_bounds, repair_strategy, parents=population, rng=rng)
+    return out
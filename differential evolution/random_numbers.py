@@ -0,0 +1,147 @@
+# Random number generation shared by all the modules of the algorithm
+
+# All the operators draw random numbers from a numpy.random.Generator. An operator uses the generator passed to it as
+# 'rng', or the shared generator of this module if none is passed, so that:
+#   [1] A run is reproducible: seed the shared generator once with set_seed(), or pass a seeded generator around.
+#   [2] Parallel runs are reproducible and independent: give each worker its own generator from spawn_rngs(), streams
+#       spawned from the same seed never overlap, whatever the number of workers.
+#   [3] Random numbers are drawn in bulk: one call per operator (per population), instead of one call per gene.
+
+# import necessary libraries
+import numpy as np
+
+# ======================================================================================================================
+# ===== Generators =====================================================================================================
+# ======================================================================================================================
+
+# shared generator, used by the operators when no generator is passed
+_shared_rng = np.random.default_rng()
+
+
+def set_seed(seed=None):
+    """
+    Function to reseed the shared generator
+
+    :param seed: (int or numpy.random.SeedSequence) seed of the generator, fresh entropy from the OS is used if not
+                 passed
+    :return: (numpy.random.Generator) the new shared generator
+    """
+    global _shared_rng
+    _shared_rng = np.random.default_rng(seed)
+    return _shared_rng
+
+
+def get_rng(rng=None):
+    """
+    Function to resolve the generator an operator should use
+
+    :param rng: (numpy.random.Generator, or int) generator to be used, or seed of a new generator, the shared generator
+                is used if not passed
+    :return: (numpy.random.Generator) generator to be used
+    """
+    if rng is None:
+        return _shared_rng
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn_rngs(n, seed=None):
+    """
+    Function to create independent generators, e.g. one for each parallel worker
+
+    The generators are spawned from a single numpy.random.SeedSequence, so their streams are statistically independent,
+    and a run with the same seed and number of workers is reproducible.
+
+    :param n: (int) number of generators
+    :param seed: (int or numpy.random.SeedSequence) root seed, fresh entropy from the OS is used if not passed
+    :return: (list of numpy.random.Generator) containing 'n' independent generators
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(s) for s in seed.spawn(n)]
+
+# ======================================================================================================================
+# ===== Bulk draws =====================================================================================================
+# ======================================================================================================================
+
+
+def uniform(low, high, size, rng=None):
+    """
+    Function to draw uniform random numbers between 'low' and 'high' in one call
+
+    :param low: (float or numpy.ndarray) lower bound(s) (inclusive)
+    :param high: (float or numpy.ndarray) upper bound(s) (exclusive)
+    :param size: (int or tuple) shape of the array to be drawn
+    :param rng: (numpy.random.Generator) generator, the shared generator is used if not passed
+    :return: (numpy.ndarray of float64) containing random numbers
+    """
+    return get_rng(rng).uniform(low, high, size)
+
+
+def random_bits(size, dtype=np.uint64, rng=None):
+    """
+    Function to draw random unsigned integers, i.e. words of random bits, in one call
+
+    :param size: (int or tuple) shape of the array to be drawn
+    :param dtype: (numpy.dtype) unsigned integer type of the words
+    :param rng: (numpy.random.Generator) generator, the shared generator is used if not passed
+    :return: (numpy.ndarray of dtype) containing random words, every bit is 0 or 1 with equal probability
+    """
+    dtype = np.dtype(dtype)
+    size = tuple(np.atleast_1d(size))
+    n = int(np.prod(size))
+    return np.frombuffer(get_rng(rng).bytes(n * dtype.itemsize), dtype=dtype).reshape(size).copy()
+
+
+def distinct_indices(low, high, k, size=None, exclude=None, rng=None):
+    """
+    Function to draw many sets of 'k' distinct random integers between 'low' and 'high', optionally excluding one
+    number from each set, without rejection loops
+
+    Algorithm:
+    --[1] The excluded number of each set (if any) is marked as taken.
+    --[2] The j'th number of every set is drawn from the values which are still free, i.e. between 0 and
+          (high - low - number of taken values), and then shifted past the taken values of that set, in ascending
+          order: for every taken value t, if x >= t then x = x + 1. This maps the draw uniformly onto the free values.
+    --[3] The drawn number is marked as taken, and the step is repeated 'k' times, every step is vectorized over all
+          the sets.
+
+    The cost is O(k^2) vectorized operations, whatever the ratio of 'k' to 'high - low' is, so it does not slow down when
+    almost all the numbers are needed, unlike regenerating a set until it has no repetitions.
+
+    :param low: (int) lowest (inclusive) acceptable random number
+    :param high: (int) highest (exclusive) acceptable random number
+    :param k: (int) number of distinct random numbers in each set
+    :param size: (int or tuple) shape of the array of sets, a single set is drawn if not passed
+    :param exclude: (int or numpy.ndarray of int) of shape 'size', number to be excluded from each set, e.g. index of the
+                    target vector, numbers outside of [low, high) exclude nothing
+    :param rng: (numpy.random.Generator) generator, the shared generator is used if not passed
+    :return: (numpy.ndarray of int) of shape size + (k,) containing sets of 'k' distinct random numbers, in the order in
+             which they were drawn
+    """
+    rng = get_rng(rng)
+    shape = () if size is None else tuple(np.atleast_1d(size))
+    m = high - low
+
+    # taken values of each set, relative to low, the excluded number goes first
+    if exclude is None:
+        taken = np.empty(shape + (0,), dtype=np.int64)
+        n_excluded = 0
+    else:
+        excluded = np.broadcast_to(np.asarray(exclude, dtype=np.int64) - low, shape)
+        inside = (excluded >= 0) & (excluded < m)
+        # excluded numbers outside of the range are never reached by the shifts
+        taken = np.where(inside, excluded, m)[..., None]
+        n_excluded = inside.astype(np.int64)
+    if np.any(k > m - n_excluded):
+        raise ValueError("Cannot draw {} distinct random numbers between {} and {}".format(k, low, high))
+
+    r = np.empty(shape + (k,), dtype=np.int64)
+    for j in range(k):
+        x = (rng.random(shape) * (m - n_excluded - j)).astype(np.int64)
+        for t in np.moveaxis(np.sort(taken, axis=-1), -1, 0):
+            x += x >= t
+        r[..., j] = x
+        taken = np.concatenate((taken, x[..., None]), axis=-1)
+    return r + low
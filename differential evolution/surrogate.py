@@ -0,0 +1,318 @@
+# Surrogate assisted pre-screening of offspring
+
+# When fitness is expensive, most offspring of crossover/mutation (or trial vectors of differential evolution) turn out
+# to be worse than their parents, and the time spent to evaluate them is wasted. A surrogate is a cheap model of the
+# fitness function, trained on the archive of all the (chromosome, fitness) pairs evaluated so far. It is used to rank
+# the candidate offspring, and only the most promising fraction of them is evaluated with the real fitness function.
+
+# Surrogates: both share the same interface, and are updated incrementally with every true evaluation
+#   KNNSurrogate :: predicted fitness is the inverse distance weighted mean of the fitness of the k nearest archived
+#                   chromosomes, adding a point costs O(1)
+#   RBFSurrogate :: Gaussian radial basis function interpolation over the most recently archived chromosomes, refitted
+#                   lazily when a prediction is needed after the archive has changed
+#       surrogate.add(chromosomes, fitnesses) :: adds evaluated chromosomes to the archive
+#       surrogate.predict(chromosomes) :: (numpy.ndarray of float64) predicted fitness of each chromosome
+#       len(surrogate) :: number of archived chromosomes
+
+# Pre-screening: SurrogateEvaluator is an evaluator (see evaluation.py), so it replaces the evaluator of the algorithm.
+# Candidates which are not evaluated get the worst possible fitness, so that they never survive: the offspring are
+# dropped by survivor selection, and a trial vector of differential evolution never replaces its target vector, e.g.
+#       evaluator = SurrogateEvaluator(SerialEvaluator(fitness), KNNSurrogate(k=5), mode="min", fraction=0.3)
+#       trial_fitnesses = evaluator(trial_vectors)
+
+# import necessary libraries
+import math
+
+import numpy as np
+
+# ======================================================================================================================
+# ===== Surrogates =====================================================================================================
+# ======================================================================================================================
+
+
+class Archive:
+    """
+    Growing (or bounded) archive of evaluated chromosomes and their fitness, stored in preallocated arrays
+
+    If 'max_size' is passed, the archive is a ring buffer, and the oldest chromosomes are overwritten first.
+
+    :param max_size: (int) maximum number of archived chromosomes, unbounded if not passed
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.x = None
+        self.y = None
+        self.size = 0
+        # number of chromosomes ever added, the next one is written at index 'n_added % capacity'
+        self.n_added = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, chromosomes, fitnesses):
+        """
+        Method to add evaluated chromosomes to the archive, chromosomes with non finite fitness are skipped
+
+        :param chromosomes: (numpy.ndarray) of shape (n, number of genes) containing evaluated chromosomes
+        :param fitnesses: (numpy.ndarray) of shape (n,) containing fitness of each chromosome
+        """
+        chromosomes = np.asarray(chromosomes, dtype=np.float64).reshape(len(fitnesses), -1)
+        fitnesses = np.asarray(fitnesses, dtype=np.float64)
+        finite = np.isfinite(fitnesses)
+        chromosomes, fitnesses = chromosomes[finite], fitnesses[finite]
+        n = len(fitnesses)
+        if n == 0:
+            return
+        if self.max_size is not None and n > self.max_size:
+            chromosomes, fitnesses = chromosomes[-self.max_size:], fitnesses[-self.max_size:]
+            n = self.max_size
+
+        if self.x is None:
+            capacity = self.max_size if self.max_size is not None else max(n, 64)
+            self.x = np.empty((capacity, chromosomes.shape[1]), dtype=np.float64)
+            self.y = np.empty(capacity, dtype=np.float64)
+        elif self.max_size is None and self.size + n > len(self.y):
+            # grow geometrically, so that adding is amortized O(1) per chromosome
+            capacity = max(2 * len(self.y), self.size + n)
+            self.x = np.concatenate((self.x[:self.size], np.empty((capacity - self.size, self.x.shape[1]))))
+            self.y = np.concatenate((self.y[:self.size], np.empty(capacity - self.size)))
+
+        index = (self.n_added + np.arange(n)) % len(self.y)
+        self.x[index] = chromosomes
+        self.y[index] = fitnesses
+        self.n_added += n
+        self.size = min(self.size + n, len(self.y))
+
+    def points(self):
+        """
+        Method to get the archived chromosomes and their fitness
+
+        :return: (tuple) containing (numpy.ndarray) of shape (size, number of genes) and (numpy.ndarray) of shape (size,),
+                 views of the archive
+        """
+        return self.x[:self.size], self.y[:self.size]
+
+    def recent(self, n):
+        """
+        Method to get the 'n' most recently archived chromosomes and their fitness
+
+        :param n: (int) number of chromosomes
+        :return: (tuple) containing (numpy.ndarray) of shape (n, number of genes) and (numpy.ndarray) of shape (n,)
+        """
+        n = min(n, self.size)
+        index = (self.n_added - n + np.arange(n)) % len(self.y)
+        return self.x[index], self.y[index]
+
+
+def squared_distances(a, b):
+    """
+    Function to calculate squared euclidean distances between every row of 'a' and every row of 'b'
+
+    Uses |a - b|^2 = |a|^2 - 2 a.b + |b|^2, i.e. a single matrix product instead of a (len(a), len(b), D) difference
+    tensor.
+
+    :param a: (numpy.ndarray) of shape (n, D)
+    :param b: (numpy.ndarray) of shape (m, D)
+    :return: (numpy.ndarray) of shape (n, m) containing squared distances
+    """
+    d = np.einsum("ij,ij->i", a, a)[:, None] - 2 * (a @ b.T) + np.einsum("ij,ij->i", b, b)[None, :]
+    # rounding can make distances of (almost) equal rows slightly negative
+    return np.maximum(d, 0, out=d)
+
+
+class KNNSurrogate:
+    """
+    k nearest neighbours surrogate: predicted fitness is the inverse distance weighted mean fitness of the 'k' nearest
+    archived chromosomes
+
+    :param k: (int) number of neighbours
+    :param max_archive: (int) maximum number of archived chromosomes, oldest are forgotten first, unbounded if not
+                        passed
+    """
+
+    def __init__(self, k=5, max_archive=None):
+        self.k = k
+        self.archive = Archive(max_archive)
+
+    def __len__(self):
+        return len(self.archive)
+
+    def add(self, chromosomes, fitnesses):
+        self.archive.add(chromosomes, fitnesses)
+
+    def predict(self, chromosomes):
+        x, y = self.archive.points()
+        chromosomes = np.asarray(chromosomes, dtype=np.float64).reshape(len(chromosomes), -1)
+        k = min(self.k, len(y))
+        d = squared_distances(chromosomes, x)
+        nearest = np.argpartition(d, k - 1, axis=1)[:, :k]
+        d = np.sqrt(np.take_along_axis(d, nearest, axis=1))
+        # an archived chromosome at (almost) zero distance dominates the weights
+        w = 1 / np.maximum(d, 1e-12)
+        return (w * y[nearest]).sum(axis=1) / w.sum(axis=1)
+
+
+class RBFSurrogate:
+    """
+    Gaussian radial basis function surrogate, interpolating the fitness of the 'max_centers' most recently archived
+    chromosomes
+
+    Width of the basis functions is the mean distance between a center and its nearest neighbour, and a small ridge
+    term keeps the interpolation system well conditioned. The model is refitted only when a prediction is needed, after
+    new chromosomes have been archived, and the fit costs O(max_centers^3).
+
+    :param max_centers: (int) maximum number of centers of the basis functions
+    :param ridge: (float) regularization added to the diagonal of the interpolation matrix
+    :param max_archive: (int) maximum number of archived chromosomes, oldest are forgotten first, unbounded if not
+                        passed
+    """
+
+    def __init__(self, max_centers=200, ridge=1e-8, max_archive=None):
+        self.max_centers = max_centers
+        self.ridge = ridge
+        self.archive = Archive(max_archive)
+        self.centers = None
+        self.weights = None
+        self.offset = 0.0
+        self.gamma = 1.0
+        self.fitted_at = -1
+
+    def __len__(self):
+        return len(self.archive)
+
+    def add(self, chromosomes, fitnesses):
+        self.archive.add(chromosomes, fitnesses)
+
+    def fit(self):
+        """
+        Method to fit the basis functions to the most recently archived chromosomes
+        """
+        x, y = self.archive.recent(self.max_centers)
+        d = squared_distances(x, x)
+        if len(y) > 1:
+            nearest = np.sqrt(np.partition(d + np.diag(np.full(len(y), np.inf)), 0, axis=1)[:, 0])
+            width = nearest[np.isfinite(nearest)].mean()
+        else:
+            width = 1.0
+        self.gamma = 1 / (2 * max(width, 1e-12) ** 2)
+        self.offset = y.mean()
+        k = np.exp(-self.gamma * d)
+        k[np.diag_indices_from(k)] += self.ridge
+        try:
+            self.weights = np.linalg.solve(k, y - self.offset)
+        except np.linalg.LinAlgError:
+            self.weights = np.linalg.lstsq(k, y - self.offset, rcond=None)[0]
+        self.centers = x
+        self.fitted_at = self.archive.n_added
+
+    def predict(self, chromosomes):
+        if self.fitted_at != self.archive.n_added:
+            self.fit()
+        chromosomes = np.asarray(chromosomes, dtype=np.float64).reshape(len(chromosomes), -1)
+        return self.offset + np.exp(-self.gamma * squared_distances(chromosomes, self.centers)) @ self.weights
+
+# ======================================================================================================================
+# ===== Pre-screening ==================================================================================================
+# ======================================================================================================================
+
+
+class SurrogateEvaluator:
+    """
+    Evaluator sending only the most promising fraction of the candidates to the real fitness function (refer the
+    comments above)
+
+    Until the archive holds 'warmup' chromosomes, every candidate is evaluated (within the budget) to train the
+    surrogate. After that, candidates are ranked by the surrogate, and the best 'fraction' of them is evaluated. Every
+    true evaluation is added to the archive. Candidates which are not evaluated get the worst possible fitness, and
+    'evaluated' holds the mask of the candidates of the last call which were evaluated.
+
+    When the budget of true evaluations is exhausted, no candidate is evaluated anymore, check 'exhausted' to stop the
+    algorithm.
+
+    :param evaluator: evaluator of the real fitness function (see evaluation.py), e.g. SerialEvaluator(fitness)
+    :param surrogate: surrogate model, e.g. KNNSurrogate or RBFSurrogate, KNNSurrogate() if not passed
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param fraction: (float) fraction of the candidates of every call to be evaluated, between 0 and 1
+    :param budget: (int) maximum number of true evaluations in total, unlimited if not passed
+    :param warmup: (int) number of archived chromosomes needed before the surrogate is used, 2 * number of genes if
+                   not passed
+    """
+
+    def __init__(self, evaluator, surrogate=None, mode="min", fraction=0.25, budget=None, warmup=None):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        if not 0 < fraction <= 1:
+            raise ValueError("Fraction of evaluated candidates should be between 0 and 1, got {}".format(fraction))
+        self.evaluator = evaluator
+        self.surrogate = surrogate if surrogate is not None else KNNSurrogate()
+        self.mode = mode
+        self.fraction = fraction
+        self.budget = budget
+        self.warmup = warmup
+        self.n_evaluations = 0
+        self.evaluated = None
+
+    @property
+    def remaining(self):
+        """
+        Number of true evaluations left in the budget, or None if the budget is unlimited
+        """
+        return None if self.budget is None else max(self.budget - self.n_evaluations, 0)
+
+    @property
+    def exhausted(self):
+        """
+        True if the budget of true evaluations is exhausted
+        """
+        return self.budget is not None and self.n_evaluations >= self.budget
+
+    def add(self, chromosomes, fitnesses):
+        """
+        Method to add chromosomes evaluated elsewhere (e.g. the initial population) to the archive of the surrogate
+
+        :param chromosomes: (numpy.ndarray) of shape (n, number of genes) containing evaluated chromosomes
+        :param fitnesses: (numpy.ndarray) of shape (n,) containing fitness of each chromosome
+        """
+        self.surrogate.add(chromosomes, fitnesses)
+
+    def select(self, candidates):
+        """
+        Method to choose the candidates to be evaluated with the real fitness function
+
+        :param candidates: (numpy.ndarray) of shape (n, number of genes) containing candidate chromosomes
+        :return: (numpy.ndarray of int) containing indices of the chosen candidates
+        """
+        n = len(candidates)
+        warmup = self.warmup if self.warmup is not None else 2 * candidates.shape[1]
+        if len(self.surrogate) < max(warmup, 1):
+            n_chosen = n
+        else:
+            n_chosen = math.ceil(self.fraction * n)
+        if self.budget is not None:
+            n_chosen = min(n_chosen, self.remaining)
+        if n_chosen >= n:
+            return np.arange(n)
+        if n_chosen == 0:
+            return np.empty(0, dtype=np.int64)
+        if len(self.surrogate) == 0:
+            return np.arange(n_chosen)
+
+        predicted = self.surrogate.predict(candidates)
+        if self.mode == "max":
+            predicted = -predicted
+        return np.argpartition(predicted, n_chosen - 1)[:n_chosen]
+
+    def __call__(self, candidates):
+        candidates = np.asarray(candidates, dtype=np.float64)
+        candidates = candidates.reshape(len(candidates), -1)
+        chosen = self.select(candidates)
+
+        fitnesses = np.full(len(candidates), np.inf if self.mode == "min" else -np.inf)
+        if len(chosen):
+            fitnesses[chosen] = self.evaluator(candidates[chosen])
+            self.surrogate.add(candidates[chosen], fitnesses[chosen])
+        self.n_evaluations += len(chosen)
+        self.evaluated = np.zeros(len(candidates), dtype=bool)
+        self.evaluated[chosen] = True
+        return fitnesses
@@ -0,0 +1,51 @@
+# Tests of batch binomial and exponential crossover of crossover.py
+
+# import necessary libraries
+import numpy as np
+import pytest
+
+from crossover import binomial_crossover_batch, exponential_crossover_batch
+
+
+def crossover_mask(crossover, CR, n=20000, d=8, seed=0):
+    # parameters of the trial vectors taken from the mutant vectors
+    targets = np.zeros((n, d))
+    mutants = np.ones((n, d))
+    return crossover(targets, mutants, CR, rng=np.random.default_rng(seed)) == 1
+
+
+@pytest.mark.parametrize("crossover", [binomial_crossover_batch, exponential_crossover_batch])
+def test_crossover_rate_zero_and_one(crossover):
+    # at least the parameter j_rand comes from the mutant vector, at a uniformly drawn position
+    mask = crossover_mask(crossover, 0.0)
+    assert np.all(mask.sum(axis=1) == 1)
+    assert np.allclose(mask.mean(axis=0), 1 / 8, atol=0.01)
+    assert crossover_mask(crossover, 1.0).all()
+
+
+def test_binomial_rate():
+    mask = crossover_mask(binomial_crossover_batch, 0.3)
+    # every parameter with probability CR, and j_rand in addition
+    assert abs(mask.mean() - (0.3 + 0.7 / 8)) < 0.01
+
+
+def test_exponential_run():
+    mask = crossover_mask(exponential_crossover_batch, 0.6)
+    # a single run of parameters, wrapping around the end of the vector
+    switches = np.count_nonzero(mask != np.roll(mask, 1, axis=1), axis=1)
+    assert np.all(switches <= 2)
+    # run length is 1 + number of successes before the first failure, capped at D
+    expected = (1 - 0.6 ** 8) / (1 - 0.6)
+    assert abs(mask.sum(axis=1).mean() - expected) < 0.05
+
+
+@pytest.mark.parametrize("crossover", [binomial_crossover_batch, exponential_crossover_batch])
+def test_crossover_rate_per_vector_and_output_buffer(crossover):
+    rng = np.random.default_rng(1)
+    targets, mutants = rng.random((4, 5)), rng.random((4, 5))
+    out = np.empty_like(targets)
+    trials = crossover(targets, mutants, np.array([0.0, 1.0, 0.0, 1.0]), rng=rng, out=out)
+    assert trials is out
+    assert np.array_equal(trials[[1, 3]], mutants[[1, 3]])
+    assert np.all(np.count_nonzero(trials[[0, 2]] == mutants[[0, 2]], axis=1) == 1)
+    assert np.all((trials == targets) | (trials == mutants))
@@ -0,0 +1,74 @@
+# Tests of array-based mutation of the whole population of mutation.py
+
+# import necessary libraries
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from mutation import MUTATION_STRATEGIES, mutate_population
+
+# formula of every strategy, for target vector x, best vector b, scaling factor f and random vectors r
+FORMULAS = {
+    "rand/1": lambda x, b, f, r: r[0] + f * (r[1] - r[2]),
+    "best/1": lambda x, b, f, r: b + f * (r[0] - r[1]),
+    "current-to-best/1": lambda x, b, f, r: x + f * (b - x) + f * (r[0] - r[1]),
+    "rand/2": lambda x, b, f, r: r[0] + f * (r[1] - r[2] + r[3] - r[4]),
+    "best/2": lambda x, b, f, r: b + f * (r[0] - r[1] + r[2] - r[3]),
+    "current-to-pbest/1": lambda x, b, f, r: x + f * (b - x) + f * (r[0] - r[1]),
+    "rand-to-best/1": lambda x, b, f, r: r[0] + f * (b - r[0]) + f * (r[1] - r[2]),
+}
+
+
+def explained(population, i, mutant, strategy, best, f):
+    # the mutant vector is given by the formula for some random vectors, distinct and different from the target vector
+    others = [j for j in range(len(population)) if j != i]
+    return any(np.allclose(mutant, FORMULAS[strategy](population[i], best, f, population[list(r)]))
+               for r in permutations(others, MUTATION_STRATEGIES[strategy]))
+
+
+@pytest.mark.parametrize("strategy", list(FORMULAS))
+def test_strategies(strategy):
+    rng = np.random.default_rng(0)
+    population = rng.uniform(-1, 1, (7, 3))
+    fitnesses = np.sum(population ** 2, axis=1)
+    best = population[np.argmin(fitnesses)]
+    # pbest is drawn from the single best vector
+    mutants = mutate_population(population, 0.7, strategy, "min", fitnesses, p=0.01, rng=rng)
+    assert mutants.shape == population.shape
+    for i in range(len(population)):
+        assert explained(population, i, mutants[i], strategy, best, 0.7)
+
+
+def test_types_and_scaling_factor_per_vector():
+    population = np.random.default_rng(1).uniform(-1, 1, (6, 2))
+    fitnesses = -np.sum(population ** 2, axis=1)
+    F = np.linspace(0.1, 0.9, 6)
+    mutants = mutate_population(population, F, 2, "max", fitnesses, rng=np.random.default_rng(2))
+    best = population[np.argmax(fitnesses)]
+    for i in range(len(population)):
+        assert explained(population, i, mutants[i], "best/1", best, F[i])
+    with pytest.raises(ValueError):
+        mutate_population(population, 0.5, 6)
+
+
+def test_fitness_is_calculated_once_by_the_evaluator():
+    calls = []
+
+    def evaluator(population):
+        calls.append(len(population))
+        return np.sum(population ** 2, axis=1)
+
+    population = np.random.default_rng(3).uniform(-1, 1, (8, 2))
+    mutate_population(population, 0.5, "best/2", evaluator=evaluator, rng=np.random.default_rng(4))
+    mutate_population(population, 0.5, "rand/1", evaluator=evaluator, rng=np.random.default_rng(4))
+    assert calls == [8]
+
+
+def test_bounds_and_output_buffer():
+    rng = np.random.default_rng(5)
+    population = rng.uniform(-1, 1, (50, 4))
+    out = np.empty_like(population)
+    mutants = mutate_population(population, 1.5, "rand/2", search_domain_bounds=[-1, 1], rng=rng, out=out)
+    assert mutants is out
+    assert np.all((mutants >= -1) & (mutants <= 1))
@@ -6,6 +6,9 @@
 # import necessary libraries
 import numpy as np
 
+# import necessary modules
+from random_numbers import get_rng
+
 # =====================================================================================================================
 # ===== Crossover Operators ===========================================================================================
 # =====================================================================================================================
@@ -16,7 +19,9 @@ def rv_crossover(parent1, parent2, mu):
     This function is an implementation of real valued crossover operation
 
     NOTE: If you have any bounds for chromosome, check if the newly generated children satisfy the requirements, if
-          not, discard the children, and introduce a new random chromosome satisfying the bounds.
+          not, discard the children, and introduce a new random chromosome satisfying the bounds. For whole populations,
+          use sbx_crossover_batch() instead, which respects the bounds by construction, or repair the children in
+          place with repair() of repair.py.
 
     :param parent1: (list of float) carrying chromosomes of parent1
     :param parent2: (list of float) carrying chromosomes of parent2
@@ -29,10 +34,11 @@ def rv_crossover(parent1, parent2, mu):
     # initialize empty lists to store children
     c1 = []
     c2 = []
+    # generate a random number between 0 and 1 for each chromosome, in one go
+    rs = get_rng().random(len(parent1))
     # iterate over the parents' chromosomes, and compute childrens' chromosomes and store them in lists
     for i in range(len(parent1)):
-        # generate a random number between 0 and 1
-        r = np.random.uniform(0, 1, 1)
+        r = rs[i]
         # compute value of b according to value of r
         if r > 0.5:
             b = pow(1 / (2 * (1 - r)), p)
@@ -48,3 +54,77 @@ def rv_crossover(parent1, parent2, mu):
         c1.append(c1m)
         c2.append(c2m)
     return [c1, c2]
+
+
+def sbx_crossover_batch(parents, mu, pv=0.5, search_domain_bounds=None, rng=None, out=None):
+    """
+    This function is a vectorized implementation of simulated binary crossover (SBX) of many pairs of parents at once
+
+    Every variable of every pair is crossed with probability 'pv' (otherwise children inherit it unchanged), and
+    crossed variables are spread around the parents exactly like rv_crossover() does. If bounds are passed, the bounded
+    SBX of Deb and Agrawal is used: the spread distribution of each child is truncated at the bound on its side, so
+    that children always lie within the search domain, and no child has to be discarded.
+
+    Bounded SBX, for parents y1 < y2 of a variable with bounds [yl, yu], and a uniform random number r:
+        beta = 1 + 2 * (y1 - yl) / (y2 - y1)            (1 + 2 * (yu - y2) / (y2 - y1) for the second child)
+        alpha = 2 - beta^-(mu + 1)
+        bq = (r * alpha)^(1 / (mu + 1))                 if r <= 1 / alpha
+        bq = (1 / (2 - r * alpha))^(1 / (mu + 1))       otherwise
+        c1 = ((y1 + y2) - bq * (y2 - y1)) / 2,          c2 = ((y1 + y2) + bq * (y2 - y1)) / 2
+    Without bounds alpha = 2, which is the unbounded SBX of rv_crossover().
+
+    :param parents: (numpy.ndarray of float) of shape (number of pairs, 2, number of variables) containing pairs of
+                    parents
+    :param mu: (int) crossover operator, should be between 10 and 20, take 20
+    :param pv: (float or numpy.ndarray) probability of crossing each variable, either a single value or one value per
+               variable
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per variable, children are unbounded if not passed
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :param out: (numpy.ndarray of float64) of the same shape as 'parents' to store the children in, e.g. a buffer reused
+                every generation, a new array is allocated if not passed
+    :return: (numpy.ndarray of float64) of shape (number of pairs, 2, number of variables) containing children, child
+             [i, j] is the child closer to parent [i, j]
+    """
+    rng = get_rng(rng)
+    parents = np.asarray(parents, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(parents)
+    p = 1 / (mu + 1)
+    p1, p2 = parents[:, 0], parents[:, 1]
+    y1 = np.minimum(p1, p2)
+    y2 = np.maximum(p1, p2)
+    spread = y2 - y1
+
+    # variables to be crossed, parents equal in a variable have nothing to spread
+    crossed = (rng.random(y1.shape) < pv) & (spread > 1e-14)
+    # one random number per variable and pair, used by both children
+    r = rng.random(y1.shape)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        mean = (y1 + y2) / 2
+        children = []
+        for bound_distance in ((y1 - search_domain_bounds[0], search_domain_bounds[1] - y2)
+                               if search_domain_bounds is not None else (None, None)):
+            if bound_distance is None:
+                alpha = 2.0
+            else:
+                beta = 1 + 2 * np.maximum(bound_distance, 0) / spread
+                alpha = 2 - beta ** -(mu + 1)
+            ra = r * alpha
+            bq = np.where(r <= 1 / alpha, ra, 1 / (2 - ra)) ** p
+            children.append(bq * spread / 2)
+        c_low = mean - children[0]
+        c_high = mean + children[1]
+
+    if search_domain_bounds is not None:
+        np.clip(c_low, search_domain_bounds[0], search_domain_bounds[1], out=c_low)
+        np.clip(c_high, search_domain_bounds[0], search_domain_bounds[1], out=c_high)
+
+    # child closer to the smaller parent replaces it, uncrossed variables are copied from the parents
+    first_is_low = p1 <= p2
+    out[...] = parents
+    np.copyto(out[:, 0], np.where(first_is_low, c_low, c_high), where=crossed)
+    np.copyto(out[:, 1], np.where(first_is_low, c_high, c_low), where=crossed)
+    return out
@@ -35,3 +35,27 @@ def fitness(chromosome):
     # Implement the fitness evaluation function here
 
     return fitness
+
+
+# ======================================================================================================================
+# ===== Batch fitness evaluation function (optional) ===================================================================
+# ======================================================================================================================
+
+# If fitness of the whole population can be calculated in one call (e.g. as a vectorized numpy expression), replace
+# 'fitness_batch = None' below with a function following this template. Wherever a population is evaluated, it will be
+# preferred over calling fitness() once for every chromosome (see evaluation.py).
+#
+# def fitness_batch(population):
+#     """
+#     This function will calculate fitness of every chromosome of the input population in one call
+#
+#     :param population: (numpy.ndarray of float64) of shape (population size, number of genes) containing all the
+#                        chromosomes
+#     :return: (numpy.ndarray) of shape (population size,) containing fitness of every chromosome
+#     """
+#
+#     # Implement the batch fitness evaluation function here
+#
+#     return fitnesses
+
+fitness_batch = None
@@ -4,13 +4,18 @@
 # import necessary libraries
 import numpy as np
 
+# import necessary modules
+from random_numbers import get_rng
+
 
 def rv_mutate(chromosome, eta):
     """
     This function is an implementation of real value mutation
 
     NOTE: If you have any bounds for chromosome, check if the newly generated children satisfy the requirements, if
-          not, discard the children, and introduce a new random chromosome satisfying the bounds.
+          not, discard the children, and introduce a new random chromosome satisfying the bounds. For whole populations,
+          use polynomial_mutation() instead, which mutates every gene independently and respects the bounds, or repair
+          the mutated population in place with repair() of repair.py.
 
     :param chromosome: (list of float) containing input chromosome to be mutated
     :param eta: (int) mutation operator, typically between 15 to 20, take 15
@@ -19,7 +24,7 @@ def rv_mutate(chromosome, eta):
     # calculate p
     p = 1 / (eta + 1)
     # generate a random number r between 0 and 1, and calculate d accordingly
-    r = np.random.uniform(0, 1, 1)
+    r = get_rng().random()
     if r > 0.5:
         d = 1 - pow((2 * (1 - r)), p)
     elif r <= 0.5:
@@ -29,4 +34,64 @@ def rv_mutate(chromosome, eta):
 
     # NOTE: If you need to check for bounds, do it here before returning
 
-    return mutated_chromosome
\ No newline at end of file
+    return mutated_chromosome
+
+
+def polynomial_mutation(population, eta, pm=None, search_domain_bounds=None, rng=None):
+    """
+    This function is a vectorized implementation of bounded polynomial mutation of the whole population, in place
+
+    Every gene is mutated independently with probability 'pm'. Mutated genes are moved by a random step drawn from the
+    polynomial distribution, truncated so that the gene stays within its bounds [yl, yu] (Deb and Goyal):
+        d1 = (y - yl) / (yu - yl),  d2 = (yu - y) / (yu - yl),  and a uniform random number r
+        dq = (2r + (1 - 2r) * (1 - d1)^(eta + 1))^(1 / (eta + 1)) - 1                   if r < 0.5
+        dq = 1 - (2(1 - r) + 2(r - 0.5) * (1 - d2)^(eta + 1))^(1 / (eta + 1))           otherwise
+        y = y + dq * (yu - yl)
+    Without bounds, the step is not truncated, i.e. d1 = d2 = 1 and yu - yl = 1, which is the step of rv_mutate().
+    Only the selected genes are gathered (by a boolean mask), mutated and scattered back, so the cost and the temporary
+    memory are proportional to the number of mutated genes.
+
+    :param population: (numpy.ndarray of float64) of shape (population size, number of genes) containing population,
+                       mutated in place
+    :param eta: (int) mutation operator, typically between 15 to 20, take 15
+    :param pm: (float or numpy.ndarray) probability of mutating each gene, either a single value or one value per gene,
+               1 / number of genes if not passed
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene, genes are unbounded if not passed
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :return: (numpy.ndarray of float64) the mutated population, i.e. the input array
+    """
+    rng = get_rng(rng)
+    if pm is None:
+        pm = 1 / population.shape[1]
+    mask = rng.random(population.shape) < pm
+    if not mask.any():
+        return population
+
+    y = population[mask]
+    r = rng.random(len(y))
+    p = 1 / (eta + 1)
+
+    if search_domain_bounds is None:
+        width = 1.0
+        d1 = d2 = np.ones_like(y)
+    else:
+        # bounds of the mutated genes
+        lower = np.broadcast_to(np.asarray(search_domain_bounds[0], dtype=np.float64), population.shape)[mask]
+        upper = np.broadcast_to(np.asarray(search_domain_bounds[1], dtype=np.float64), population.shape)[mask]
+        width = upper - lower
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d1 = (y - lower) / width
+            d2 = (upper - y) / width
+    left = r < 0.5
+    dq = np.empty_like(y)
+    dq[left] = (2 * r[left] + (1 - 2 * r[left]) * (1 - d1[left]) ** (eta + 1)) ** p - 1
+    right = ~left
+    dq[right] = 1 - (2 * (1 - r[right]) + 2 * (r[right] - 0.5) * (1 - d2[right]) ** (eta + 1)) ** p
+
+    y += dq * width
+    if search_domain_bounds is not None:
+        y = np.clip(y, lower, upper)
+    population[mask] = y
+    return population
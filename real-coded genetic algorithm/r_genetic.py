@@ -3,15 +3,17 @@
 
 # import necessary libraries
 import time
-s = time.time()
-
+from collections import namedtuple
 import numpy as np
 
 # import all modules
-from crossover import kp_crossover
-from fitness import fitness
-from mutation import rv_mutation
-from selection import tournament_selection, rank_selection
+from crossover import sbx_crossover_batch
+from evaluation import SerialEvaluator
+from fitness import fitness, fitness_batch
+from mutation import polynomial_mutation
+from repair import repair
+from selection import SurvivorHeap, batch_tournament_selection, round_up_to_even, survivor_selection
+from random_numbers import distinct_indices, get_rng, uniform
 
 
 # ======================================================================================================================
@@ -30,7 +32,7 @@ def init_population(size, n_of_chromosomes, search_domain_bounds):
     """
     population = []
     for i in range(size):
-        chromosome = list(np.random.uniform(search_domain_bounds[0], search_domain_bounds[1], n_of_chromosomes))
+        chromosome = list(uniform(search_domain_bounds[0], search_domain_bounds[1], n_of_chromosomes))
         population.append(chromosome)
     return population
 
@@ -59,27 +61,280 @@ def terminator(best_pop):
 # ===== Genetic algorithm ==============================================================================================
 # ======================================================================================================================
 
+# result of a generation, yielded by RealGeneticAlgorithm.generations()
+GenerationResult = namedtuple("GenerationResult",
+                              ["generation", "best_fitness", "best_member", "n_evaluations", "elapsed_time"])
+
+
+class RealGeneticAlgorithm:
+    """
+    This class is an implementation of real coded genetic algorithm over an array-backed population
+
+    The engine holds the population matrix, the fitness vector and the random number generator, so that it can be
+    advanced one generation at a time with step(), run until a stopping criteria is met with run(), or iterated with
+    generations() to stream the result of every generation.
+
+    Algorithm (one generation):
+    --[1] Select the members for mating, by tournaments over the cached fitness of the population.
+    --[2] Perform simulated binary crossover (SBX), i.e. mate the selected members to produce children.
+    --[3] Perform polynomial mutation over the children.
+    --[4] Repair the genes of the children which are outside of the search domain, and evaluate fitness of the
+          children. Fitness of the population is never recomputed.
+    --[5] Select the top members from the population and the children, and trim the size.
+
+    Schemes:
+        "generational" :: every generation produces round_up_to_even(size * cp) children from parents selected by
+                          tournaments without replacement
+        "steady-state" :: every generation produces a single pair of children from two parents selected by independent
+                          tournaments, the children replace the worst members of the population if they are better
+
+    Memory: the population and the children are stored in one preallocated (size + number of children, number of
+    chromosomes) matrix, population first. Parents, children and fitness are written into preallocated buffers, and
+    the children surviving a generation overwrite the members they replace, in place (see survivor_selection() and
+    SurvivorHeap of selection.py), so a generation does no per-member allocation, and the population is always one
+    contiguous array.
+
+    :param fitness: (function) to calculate fitness of a member, i.e. (numpy.ndarray of float64) containing its genes
+    :param n_of_chromosomes: (int) number of chromosomes for each population member
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per chromosome
+    :param size: (int) size of the population
+    :param cp: (float) crossover probability, typically should be between 0.8 and 1
+    :param mp: (float) mutation probability of each gene, 1 / number of chromosomes if not passed
+    :param mu: (int) crossover operator, should be between 10 and 20, take 20
+    :param eta: (int) mutation operator, typically between 15 to 20, take 15
+    :param pv: (float) probability of crossing each variable of a pair of parents
+    :param tournament_size: (int) number of members allowed to participate in each tournament that is held
+    :param mode: (string) to set whether working on minimization(pass: "min") or maximization(pass: "max") problem
+    :param scheme: (string) pass: "generational" or "steady-state" (refer the comments above)
+    :param repair_strategy: (string) strategy to move offending genes back into the search domain (see repair.py)
+    :param fitness_batch: (function) to calculate fitness of a (number of members, number of chromosomes) matrix in
+                          one call, preferred over 'fitness' if passed (see evaluation.py)
+    :param evaluator: evaluator of members (see evaluation.py), e.g. ProcessPoolEvaluator to evaluate in parallel,
+                      SerialEvaluator of 'fitness' and 'fitness_batch' is used if not passed
+    :param seed: (int or numpy.random.Generator) seed of the random number generator, for reproducible runs, or the
+                 generator itself, the shared generator of random_numbers.py is used if not passed
+    """
+
+    def __init__(self, fitness, n_of_chromosomes, search_domain_bounds, size=100, cp=0.8, mp=None, mu=20, eta=15,
+                 pv=0.5, tournament_size=2, mode="min", scheme="generational", repair_strategy="clip",
+                 fitness_batch=None, evaluator=None, seed=None):
+        if mode not in ("min", "max"):
+            raise ValueError("Incorrect mode selected, please pass 'min' or 'max' as mode")
+        if scheme not in ("generational", "steady-state"):
+            raise ValueError("Incorrect scheme selected, please pass 'generational' or 'steady-state' as scheme")
+        self.evaluator = evaluator if evaluator is not None else SerialEvaluator(fitness, fitness_batch)
+        self.size = size
+        self.cp = cp
+        self.mp = mp if mp is not None else 1 / n_of_chromosomes
+        self.mu = mu
+        self.eta = eta
+        self.pv = pv
+        self.tournament_size = tournament_size
+        self.mode = mode
+        self.scheme = scheme
+        self.repair_strategy = repair_strategy
+        self.search_domain_bounds = search_domain_bounds
+        self.rng = get_rng(seed)
+
+        # number of children produced in every generation
+        if scheme == "generational":
+            self.n_offspring = round_up_to_even(size * cp)
+        else:
+            self.n_offspring = 2
+
+        # preallocated buffers: population followed by children, survivors are compacted in place, and the parents
+        self.pool = np.empty((size + self.n_offspring, n_of_chromosomes))
+        self.pool_fitnesses = np.empty(size + self.n_offspring)
+        self.parents = np.empty((self.n_offspring // 2, 2, n_of_chromosomes))
+
+        # Step 1: Initialize the population, and evaluate it once
+        self.start_time = time.time()
+        self.generation = 0
+        self.n_evaluations = 0
+        self.population[...] = uniform(search_domain_bounds[0], search_domain_bounds[1], self.population.shape,
+                                       self.rng)
+        self.fitnesses[...] = self.evaluate(self.population)
+
+        # steady-state scheme keeps the population in a heap, the worst member on top
+        self.survivor_heap = SurvivorHeap(self.fitnesses, mode) if scheme == "steady-state" else None
+
+    @property
+    def population(self):
+        """
+        (numpy.ndarray of float64) of shape (size, number of chromosomes), view of the population in the buffer
+        """
+        return self.pool[:self.size]
+
+    @property
+    def fitnesses(self):
+        """
+        (numpy.ndarray of float64) of shape (size,), view of the fitness of the population in the buffer
+        """
+        return self.pool_fitnesses[:self.size]
+
+    @property
+    def offspring(self):
+        """
+        (numpy.ndarray of float64) of shape (number of children, number of chromosomes), view of the children in the
+        buffer
+        """
+        return self.pool[self.size:]
+
+    def evaluate(self, members):
+        """
+        Method to evaluate fitness of members
+
+        Evaluations are counted by the evaluator if it counts them (e.g. SurrogateEvaluator of surrogate.py, which
+        evaluates only some of the members), every member is counted otherwise.
+
+        :param members: (numpy.ndarray of float64) of shape (number of members, number of chromosomes)
+        :return: (numpy.ndarray of float64) containing fitness of each member
+        """
+        counted = getattr(self.evaluator, "n_evaluations", None)
+        fitnesses = self.evaluator(members)
+        if counted is None:
+            self.n_evaluations += len(members)
+        else:
+            self.n_evaluations += self.evaluator.n_evaluations - counted
+        return fitnesses
+
+    def best_index(self):
+        """
+        Method to find the index of the fittest member of the population
+
+        :return: (int) index of the fittest member
+        """
+        if self.mode == "min":
+            return int(np.argmin(self.fitnesses))
+        return int(np.argmax(self.fitnesses))
+
+    def select(self):
+        """
+        Method to select the members for mating, by tournaments over the cached fitness of the population
+
+        :return: (numpy.ndarray of int) containing indices of selected members, consecutive members are mated
+        """
+        if self.scheme == "generational":
+            return batch_tournament_selection(self.fitnesses, self.cp, self.tournament_size, self.mode, self.rng)
+
+        # two independent tournaments, among distinct members each
+        contestants = distinct_indices(0, self.size, self.tournament_size, size=2, rng=self.rng)
+        contestant_fitnesses = self.fitnesses[contestants]
+        if self.mode == "min":
+            winners = np.argmin(contestant_fitnesses, axis=1)
+        else:
+            winners = np.argmax(contestant_fitnesses, axis=1)
+        return contestants[np.arange(2), winners]
+
+    def survive(self):
+        """
+        Method to select the top members from the population and the children, and trim the size
+
+        The children entering the population overwrite the members they replace, in place.
+        """
+        offspring_fitnesses = self.pool_fitnesses[self.size:]
+        if self.survivor_heap is not None:
+            replaced, entering = self.survivor_heap.merge(offspring_fitnesses)
+        else:
+            replaced, entering = survivor_selection(self.fitnesses, offspring_fitnesses, self.mode)
+        self.population[replaced] = self.offspring[entering]
+        self.fitnesses[replaced] = offspring_fitnesses[entering]
+
+    def step(self):
+        """
+        Method to advance the algorithm by one generation
+
+        :return: (GenerationResult) containing result of the generation
+        """
+        parents = self.parents.reshape(-1, self.pool.shape[1])
+        offspring = self.offspring
+
+        # Step 2: Select the members for mating, consecutive parents form a pair
+        np.take(self.population, self.select(), axis=0, out=parents)
+
+        # Step 3: Perform crossover, i.e. mate the selected members to produce children
+        sbx_crossover_batch(self.parents, self.mu, self.pv, self.search_domain_bounds, self.rng,
+                            out=offspring.reshape(self.parents.shape))
+
+        # Step 4: Perform mutation over the children, and move them back into the search domain
+        polynomial_mutation(offspring, self.eta, self.mp, self.search_domain_bounds, self.rng)
+        repair(offspring, self.search_domain_bounds, self.repair_strategy, parents=parents, rng=self.rng)
+
+        # Step 5: Evaluate fitness of the children, and select the top members and trim the size
+        self.pool_fitnesses[self.size:] = self.evaluate(offspring)
+        self.survive()
+
+        self.generation += 1
+        return self.result()
+
+    def result(self):
+        """
+        Method to summarize the current state of the algorithm
+
+        :return: (GenerationResult) containing generation number, best fitness, best member, number of fitness
+                 evaluations so far and elapsed time
+        """
+        best = self.best_index()
+        return GenerationResult(self.generation, self.fitnesses[best], self.population[best].copy(),
+                                self.n_evaluations, time.time() - self.start_time)
+
+    def generations(self):
+        """
+        Generator advancing the algorithm one generation at a time, for streaming consumers
+
+        :return: (generator) yielding GenerationResult of every generation, endlessly
+        """
+        while True:
+            yield self.step()
 
-# Define parameters
-cp = 0.8
-mp = 0.2
-mu = 20
-eta = 15
+    def run(self, max_generations=None, max_evaluations=None, time_budget=None):
+        """
+        Method to run the algorithm until a stopping criteria is met
 
-# Step 1: Initialize the population
+        At least one stopping criteria should be passed. The algorithm stops before a generation which would exceed
+        'max_evaluations', and after the generation which exceeds 'time_budget'. It also stops when the budget of true
+        evaluations of the evaluator is exhausted (see SurrogateEvaluator of surrogate.py).
 
-# Repeat from step 2 to 5 until termination criteria is not met
+        :param max_generations: (int) maximum number of generations
+        :param max_evaluations: (int) maximum number of fitness evaluations, including the initial population
+        :param time_budget: (float) maximum running time in seconds, measured from the creation of the engine
+        :return: (GenerationResult) containing result of the last generation
+        """
+        if max_generations is None and max_evaluations is None and time_budget is None:
+            raise ValueError("Please pass at least one stopping criteria")
 
-# Step 2: Select the members for mating
+        result = self.result()
+        # Check for terminating condition
+        while True:
+            if max_generations is not None and self.generation >= max_generations:
+                break
+            if max_evaluations is not None and self.n_evaluations + self.n_offspring > max_evaluations:
+                break
+            if time_budget is not None and time.time() - self.start_time >= time_budget:
+                break
+            # budget of true evaluations of the evaluator, e.g. SurrogateEvaluator
+            if getattr(self.evaluator, "exhausted", False):
+                break
+            result = self.step()
+        return result
 
-# Step 3: Perform crossover, i.e. mate the selected members to produce children
 
-# Step 4: Perform mutation over the population: first select population, and then perform mutation
+if __name__ == "__main__":
+    s = time.time()
 
-# Step 5: Evaluate fitness the new population, and select the top members and trim the size
+    # Define parameters
+    cp = 0.8
+    mp = None  # mutation probability of each gene, defaults to 1 / number of chromosomes
+    mu = 20
+    eta = 15
 
-# Check for terminating condition
+    ga = RealGeneticAlgorithm(fitness, n_of_chromosomes=10, search_domain_bounds=[-5, 5], size=100, cp=cp, mp=mp,
+                              mu=mu, eta=eta, fitness_batch=fitness_batch)
+    best = ga.run(max_generations=500)
+    print("Best fitness: ", best.best_fitness)
+    print("Best member: ", best.best_member)
 
-# Print elapsed time
-e = time.time() - s
-print("Elapsed Time: ", e)
+    # Print elapsed time
+    e = time.time() - s
+    print("Elapsed Time: ", e)
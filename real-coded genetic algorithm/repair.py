@@ -0,0 +1,91 @@
+# Bound handling (repair) of offspring
+
+# Crossover and mutation of real valued chromosomes (and mutation of differential evolution, V = X_r1 + F*(X_r2 - X_r3))
+# can produce genes outside of the search domain. Instead of discarding such offspring and generating new ones, which
+# wastes evaluations, the repair stage moves every offending gene back into its bounds, on the whole offspring matrix at
+# once, in place. It is plugged in right after crossover and/or mutation:
+#       children = sbx_crossover_batch(parents, mu)
+#       repair(children.reshape(-1, n_of_chromosomes), search_domain_bounds, "reflect")
+#       mutants = np.array(mutate_vectors_type1(population, F))
+#       repair(mutants, search_domain_bounds, "midpoint", parents=population)
+
+# Repair strategies, for a gene y outside of its bounds [yl, yu]:
+#   "clip" :: y is set to the nearest bound
+#   "reflect" :: y is mirrored at the bound it crossed, repeatedly, until it is inside, e.g. yu + d -> yu - d
+#   "wrap" :: y re-enters the domain from the opposite bound, i.e. the domain is periodic, e.g. yu + d -> yl + d
+#   "random" :: y is reinitialized uniformly within the bounds
+#   "midpoint" :: y is set to the midpoint between the corresponding gene of its parent (e.g. the target vector of
+#                 differential evolution) and the bound it crossed, parent genes should be inside the bounds
+# NaN genes have no bound they crossed, so they are reinitialized uniformly by every strategy.
+
+# import necessary libraries
+import numpy as np
+
+from random_numbers import get_rng
+
+# ======================================================================================================================
+# ===== Repair functions ===============================================================================================
+# ======================================================================================================================
+
+REPAIR_STRATEGIES = ("clip", "reflect", "wrap", "random", "midpoint")
+
+
+def repair(population, search_domain_bounds, strategy="clip", parents=None, rng=None):
+    """
+    Function to move genes outside of the search domain back into it, in place
+
+    Only the offending genes are gathered (by a boolean mask), repaired and scattered back, so a population which is
+    already within the bounds costs a single pair of comparisons.
+
+    :param population: (numpy.ndarray of float64) of shape (population size, number of genes) containing offspring,
+                       repaired in place
+    :param search_domain_bounds: (list) [lower bound, upper bound] within which solution is to be searched, bounds can
+                                 also be arrays containing one bound per gene
+    :param strategy: (string) repair strategy, pass: "clip", "reflect", "wrap", "random" or "midpoint" (refer the
+                     comments above)
+    :param parents: (numpy.ndarray of float64) of the same shape as 'population' containing the parent of each
+                    offspring, needed by "midpoint" strategy only
+    :param rng: (numpy.random.Generator) random number generator, the shared generator of random_numbers.py is used if
+                not passed
+    :return: (int) number of repaired genes
+    """
+    if strategy not in REPAIR_STRATEGIES:
+        raise ValueError("Incorrect strategy selected, please pass one of {} as strategy".format(REPAIR_STRATEGIES))
+    if strategy == "midpoint" and parents is None:
+        raise ValueError("Parents are needed by 'midpoint' repair strategy")
+
+    lower_bound = np.asarray(search_domain_bounds[0], dtype=np.float64)
+    upper_bound = np.asarray(search_domain_bounds[1], dtype=np.float64)
+    # NaN is not comparable to anything, so it is caught as well
+    offending = ~((population >= lower_bound) & (population <= upper_bound))
+    n_offending = int(np.count_nonzero(offending))
+    if n_offending == 0:
+        return 0
+
+    lower = np.broadcast_to(lower_bound, population.shape)[offending]
+    upper = np.broadcast_to(upper_bound, population.shape)[offending]
+    y = population[offending]
+    width = upper - lower
+    nan = np.isnan(y)
+
+    with np.errstate(invalid="ignore"):
+        if strategy == "clip":
+            y = np.clip(y, lower, upper)
+        elif strategy == "reflect":
+            # position within a period of two domain widths, mirrored in its second half
+            t = np.mod(y - lower, 2 * width)
+            y = lower + width - np.abs(t - width)
+        elif strategy == "wrap":
+            y = lower + np.mod(y - lower, width)
+        elif strategy == "random":
+            y = get_rng(rng).uniform(lower, upper)
+        else:
+            parent = np.broadcast_to(parents, population.shape)[offending]
+            y = (parent + np.where(y < lower, lower, upper)) / 2
+
+    # NaN genes, and infinite genes for which reflect and wrap are undefined
+    lost = nan | ~np.isfinite(y)
+    if lost.any():
+        y[lost] = get_rng(rng).uniform(lower[lost], upper[lost])
+    population[offending] = y
+    return n_offending
@@ -0,0 +1,41 @@
+# Tests of vectorized polynomial mutation of mutation.py
+
+# import necessary libraries
+import numpy as np
+
+from mutation import polynomial_mutation
+
+
+def test_mutated_genes_stay_within_bounds():
+    rng = np.random.default_rng(0)
+    lower, upper = np.array([-5.0, 0.0, 10.0]), np.array([5.0, 1.0, 10.5])
+    population = rng.uniform(lower, upper, (1000, 3))
+    population[:100] = lower
+    population[100:200] = upper
+    original = population.copy()
+    mutated = polynomial_mutation(population, 1, pm=1.0, search_domain_bounds=[lower, upper], rng=rng)
+    assert mutated is population
+    assert np.all((population >= lower) & (population <= upper))
+    # inner genes are always moved, a gene on a bound stays there when its step points outside of the domain
+    assert np.all(population[200:] != original[200:])
+    assert np.mean(population[:200] != original[:200]) > 0.3
+
+
+def test_mutation_probability():
+    rng = np.random.default_rng(1)
+    population = rng.uniform(0, 1, (2000, 10))
+    original = population.copy()
+    polynomial_mutation(population, 15, search_domain_bounds=[0, 1], rng=rng)
+    # 1 / number of genes by default
+    assert abs(np.mean(population != original) - 0.1) < 0.01
+    polynomial_mutation(population, 15, pm=0.0, search_domain_bounds=[0, 1], rng=rng)
+    assert np.mean(population != original) < 0.11
+
+
+def test_unbounded_mutation_is_not_clipped():
+    rng = np.random.default_rng(2)
+    population = np.full((1000, 2), 100.0)
+    polynomial_mutation(population, 1, pm=1.0, rng=rng)
+    # genes far outside of [0, 1] are mutated by steps of up to 1 in both directions
+    assert np.all(np.abs(population - 100) <= 1)
+    assert population.min() < 99.5 and population.max() > 100.5
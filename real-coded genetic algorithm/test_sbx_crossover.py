@@ -0,0 +1,42 @@
+# Tests of batch simulated binary crossover of crossover.py
+
+# import necessary libraries
+import numpy as np
+
+from crossover import sbx_crossover_batch
+
+
+def test_children_stay_within_bounds():
+    rng = np.random.default_rng(0)
+    lower, upper = np.array([-5.0, 0.0, 10.0]), np.array([5.0, 1.0, 10.5])
+    parents = rng.uniform(lower, upper, (500, 2, 3))
+    # parents on the bounds
+    parents[:50, 0] = lower
+    parents[50:100, 1] = upper
+    children = sbx_crossover_batch(parents, 2, pv=1.0, search_domain_bounds=[lower, upper], rng=rng)
+    assert children.shape == parents.shape
+    assert np.all((children >= lower) & (children <= upper))
+
+
+def test_unbounded_children_keep_the_mean_of_the_parents():
+    rng = np.random.default_rng(1)
+    parents = rng.uniform(-1, 1, (200, 2, 4))
+    children = sbx_crossover_batch(parents, 20, pv=1.0, rng=rng)
+    assert np.allclose(children.sum(axis=1), parents.sum(axis=1))
+    # child [i, j] is the child closer to parent [i, j]
+    assert np.all(np.abs(children[:, 0] - parents[:, 0]) <= np.abs(children[:, 0] - parents[:, 1]) + 1e-12)
+    # with a low distribution index, children may leave the range of the parents
+    spread = sbx_crossover_batch(parents, 0.5, pv=1.0, rng=rng)
+    assert np.any(spread.max(axis=1) > parents.max(axis=1))
+
+
+def test_uncrossed_variables_are_copied():
+    rng = np.random.default_rng(2)
+    parents = rng.uniform(-1, 1, (100, 2, 5))
+    out = np.empty_like(parents)
+    children = sbx_crossover_batch(parents, 15, pv=0.0, rng=rng, out=out)
+    assert children is out
+    assert np.array_equal(children, parents)
+    # equal parents have nothing to spread
+    parents[:, 1] = parents[:, 0]
+    assert np.array_equal(sbx_crossover_batch(parents, 15, pv=1.0, rng=rng), parents)
@@ -0,0 +1,76 @@
+# Tests of surrogate assisted pre-screening of surrogate.py
+
+# NOTE: surrogate.py of differential evolution is the same, so it is tested here only.
+
+# import necessary libraries
+import numpy as np
+import pytest
+
+from evaluation import SerialEvaluator
+from surrogate import Archive, KNNSurrogate, RBFSurrogate, SurrogateEvaluator
+
+
+def sphere(chromosome):
+    return float(np.sum(np.asarray(chromosome) ** 2))
+
+
+def test_archive_ring_buffer():
+    archive = Archive(max_size=4)
+    archive.add(np.arange(6.0).reshape(3, 2), [0.0, 1.0, np.inf])
+    archive.add(np.arange(6.0, 12.0).reshape(3, 2), [2.0, 3.0, 4.0])
+    x, y = archive.recent(4)
+    # non finite fitness is skipped, and the oldest chromosome is overwritten first
+    assert len(archive) == 4 and archive.n_added == 5
+    assert np.array_equal(y, [1.0, 2.0, 3.0, 4.0])
+    assert np.array_equal(x[0], [2.0, 3.0])
+
+
+@pytest.mark.parametrize("surrogate", [KNNSurrogate(k=3), RBFSurrogate(max_centers=100)])
+def test_surrogates_interpolate_and_rank(surrogate):
+    rng = np.random.default_rng(0)
+    x = rng.uniform(-2, 2, (100, 2))
+    y = np.sum(x ** 2, axis=1)
+    surrogate.add(x, y)
+    assert len(surrogate) == 100
+    # archived chromosomes are (almost) reproduced
+    assert np.allclose(surrogate.predict(x[:10]), y[:10], atol=1e-3)
+    # and new ones are ranked about right
+    candidates = rng.uniform(-2, 2, (50, 2))
+    predicted = surrogate.predict(candidates)
+    assert np.corrcoef(predicted, np.sum(candidates ** 2, axis=1))[0, 1] > 0.9
+
+
+def test_surrogate_evaluator_counts_true_evaluations():
+    calls = []
+
+    def fitness_batch(population):
+        calls.append(len(population))
+        return np.sum(population ** 2, axis=1)
+
+    evaluator = SurrogateEvaluator(SerialEvaluator(sphere, fitness_batch), mode="min", fraction=0.25, budget=30,
+                                   warmup=8)
+    rng = np.random.default_rng(1)
+    # every candidate is evaluated until the surrogate is warmed up
+    fitnesses = evaluator(rng.uniform(-1, 1, (10, 2)))
+    assert evaluator.n_evaluations == 10 and evaluator.evaluated.all() and np.all(np.isfinite(fitnesses))
+    # then only a fraction, the others get the worst fitness
+    fitnesses = evaluator(rng.uniform(-1, 1, (20, 2)))
+    assert evaluator.n_evaluations == 15 and np.count_nonzero(evaluator.evaluated) == 5
+    assert np.all(fitnesses[~evaluator.evaluated] == np.inf)
+    # and never beyond the budget
+    for _ in range(10):
+        evaluator(rng.uniform(-1, 1, (20, 2)))
+    assert evaluator.n_evaluations == 30 and evaluator.exhausted and evaluator.remaining == 0
+    assert sum(calls) == evaluator.n_evaluations
+
+
+def test_surrogate_evaluator_prefers_promising_candidates():
+    evaluator = SurrogateEvaluator(SerialEvaluator(sphere), KNNSurrogate(k=3), mode="max", fraction=0.1)
+    rng = np.random.default_rng(2)
+    archived = rng.uniform(-3, 3, (200, 2))
+    evaluator.add(archived, np.sum(archived ** 2, axis=1))
+    candidates = rng.uniform(-3, 3, (100, 2))
+    evaluator(candidates)
+    chosen = np.sum(candidates[evaluator.evaluated] ** 2, axis=1)
+    # the chosen candidates are among the fittest (the farthest from the origin)
+    assert chosen.mean() > np.quantile(np.sum(candidates ** 2, axis=1), 0.75)